@@ -1,15 +1,28 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
-import os
+from pydantic import AliasChoices, Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     app_name: str = "Inventory Management System"
     app_version: str = "1.0.0"
     debug: bool = False
+    # Workers don't share caches, Prometheus registries or the SQLite write lock;
+    # only raise this with a server database
+    workers: int = Field(1, ge=1, validation_alias=AliasChoices("UVICORN_WORKERS", "WORKERS"))
     
     database_url: str = "sqlite:///./data/inventory.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
     redis_url: str = "redis://localhost:6379"
+    redis_max_connections: int = 32
+    redis_health_check_interval: int = 30
+    redis_socket_timeout: float = 5.0
+    
+    cors_origins: List[str] = ["http://localhost:8000"]
+    cors_max_age_seconds: int = 86400
     
     jwt_secret_key: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
@@ -27,10 +40,21 @@ class Settings(BaseSettings):
     
     log_level: str = "INFO"
     log_format: str = "json"
+    access_log: bool = False
+    
+    @model_validator(mode="after")
+    def _check_workers(self) -> "Settings":
+        if self.workers > 1 and self.database_url.startswith("sqlite"):
+            raise ValueError("Multiple workers require a server database; SQLite allows a single writer")
+        return self
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True
+    )
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
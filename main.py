@@ -1,38 +1,75 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import uvicorn
 
-from src.utils.database import init_db
+from src.utils.database import init_db, AsyncSessionLocal
 from src.config.event_bus_config import event_bus_config
 from src.utils.logging import configure_logging, get_logger
 from src.utils.middleware import LoggingMiddleware, MetricsMiddleware
 from src.utils.prometheus import prometheus_metrics
+from src.services.inventory_service import InventoryService
+from src.services.store_service import StoreService
+from src.services.event_service import EventService
 from src.api import inventory, stores, health
-from config.settings import settings
+from config.settings import get_settings
+
+settings = get_settings()
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
-    configure_logging()
+async def event_bus_lifespan(app: FastAPI):
     logger = get_logger(__name__)
     
-    logger.info("Starting application")
-    
-    await init_db()
-    
     event_bus = event_bus_config.get_event_bus()
     await event_bus.connect()
     logger.info("Event bus (Redis) connected successfully")
     
-    logger.info("Application started successfully")
+    app.state.event_bus = event_bus
+    app.state.lock_manager = event_bus_config.get_lock_manager(event_bus)
+    app.state.cache_manager = event_bus_config.get_cache_manager(event_bus)
+    app.state.inventory_service = InventoryService(
+        event_bus, app.state.lock_manager, app.state.cache_manager
+    )
+    app.state.store_service = StoreService(event_bus)
+    
+    background_tasks = [
+        asyncio.create_task(EventService(event_bus).run_outbox_relay(AsyncSessionLocal)),
+        asyncio.create_task(app.state.inventory_service.run_reservation_expiry(AsyncSessionLocal)),
+    ]
     
-    yield
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        for task in background_tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        await event_bus.close()
+        logger.info("Event bus connection closed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    logger = get_logger(__name__)
+    
+    logger.info("Starting application")
     
-    logger.info("Shutting down application")
+    await init_db()
     
-    await event_bus.close()
-    logger.info("Event bus connection closed")
+    async with event_bus_lifespan(app):
+        # Build the OpenAPI schema up front so the first /docs hit doesn't pay for it
+        app.openapi()
+        
+        logger.info("Application started successfully")
+        
+        yield
+        
+        logger.info("Shutting down application")
     
     logger.info("Application shutdown complete")
 
@@ -41,15 +78,17 @@ app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Distributed Inventory Management System",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=["*"] if settings.debug else settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=settings.cors_max_age_seconds,
 )
 
 app.add_middleware(LoggingMiddleware)
@@ -76,5 +115,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        access_log=settings.access_log or settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.workers if not settings.debug else 1
     )
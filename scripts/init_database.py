@@ -29,6 +29,8 @@ async def init_database():
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
         raise
+    finally:
+        await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -20,21 +20,20 @@ async def reset_database():
     print("🔄 Resetting database...")
     
     try:
-        # Drop all tables
+        # Drop and recreate all tables in a single transaction
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
-        print("✅ Dropped all tables")
-        
-        # Create all tables
-        async with engine.begin() as conn:
+            print("✅ Dropped all tables")
             await conn.run_sync(Base.metadata.create_all)
-        print("✅ Created all tables")
+            print("✅ Created all tables")
         
         print("✅ Database reset completed successfully!")
         
     except Exception as e:
         print(f"❌ Error resetting database: {e}")
         raise
+    finally:
+        await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -8,27 +8,37 @@ import asyncio
 import sys
 from pathlib import Path
 from datetime import datetime
+import os
+import random
 import uuid
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.utils.database import AsyncSessionLocal
+from src.utils.database import AsyncSessionLocal, engine
 from src.models.database import ProductDB, StoreDB, InventoryDB
+from sqlalchemy import select, insert, func
+
+
+def generate_uuids(count):
+    """Generate UUID4 strings from a single os.urandom buffer"""
+    raw = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=raw[offset:offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
 
 
 async def create_sample_products(session):
     """Create sample products if they don't exist"""
-    from sqlalchemy import select
-    
     # Check if products already exist
-    result = await session.execute(select(ProductDB))
-    existing_products = result.scalars().all()
+    count = (await session.execute(select(func.count()).select_from(ProductDB))).scalar_one()
     
-    if existing_products:
-        print(f"✅ Products already exist ({len(existing_products)} found)")
-        return existing_products
+    if count > 0:
+        print(f"✅ Products already exist ({count} found)")
+        result = await session.execute(select(ProductDB.id))
+        return result.scalars().all()
     
     products = [
         {
@@ -73,36 +83,35 @@ async def create_sample_products(session):
         }
     ]
     
-    created_products = []
-    for product_data in products:
-        product = ProductDB(
+    now = datetime.utcnow()
+    created_products = [
+        ProductDB(
             id=product_data["id"],
             sku=product_data["sku"],
             name=product_data["name"],
             description=product_data["description"],
             category=product_data["category"],
             unit_price=product_data["unit_price"],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
-        session.add(product)
-        created_products.append(product)
+        for product_data in products
+    ]
+    session.add_all(created_products)
     
     print(f"✅ Created {len(created_products)} products")
-    return created_products
+    return [product.id for product in created_products]
 
 
 async def create_sample_stores(session):
     """Create sample stores if they don't exist"""
-    from sqlalchemy import select
-    
     # Check if stores already exist
-    result = await session.execute(select(StoreDB))
-    existing_stores = result.scalars().all()
+    count = (await session.execute(select(func.count()).select_from(StoreDB))).scalar_one()
     
-    if existing_stores:
-        print(f"✅ Stores already exist ({len(existing_stores)} found)")
-        return existing_stores
+    if count > 0:
+        print(f"✅ Stores already exist ({count} found)")
+        result = await session.execute(select(StoreDB.id))
+        return result.scalars().all()
     
     stores = [
         {
@@ -137,9 +146,9 @@ async def create_sample_stores(session):
         }
     ]
     
-    created_stores = []
-    for store_data in stores:
-        store = StoreDB(
+    now = datetime.utcnow()
+    created_stores = [
+        StoreDB(
             id=store_data["id"],
             name=store_data["name"],
             address=store_data["address"],
@@ -148,80 +157,84 @@ async def create_sample_stores(session):
             zip_code=store_data["zip_code"],
             status=store_data["status"],
             timezone=store_data["timezone"],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
-        session.add(store)
-        created_stores.append(store)
+        for store_data in stores
+    ]
+    session.add_all(created_stores)
     
     print(f"✅ Created {len(created_stores)} stores")
-    return created_stores
+    return [store.id for store in created_stores]
 
 
-async def create_sample_inventory(session, products, stores):
+async def create_sample_inventory(session, product_ids, store_ids):
     """Create sample inventory for all products in all stores if they don't exist"""
-    from sqlalchemy import select
-    
     # Check if inventory already exists
-    result = await session.execute(select(InventoryDB))
-    existing_inventory = result.scalars().all()
+    count = (await session.execute(select(func.count()).select_from(InventoryDB))).scalar_one()
     
-    if existing_inventory:
-        print(f"✅ Inventory already exists ({len(existing_inventory)} records found)")
+    if count > 0:
+        print(f"✅ Inventory already exists ({count} records found)")
         return
     
-    inventory_count = 0
+    now = datetime.utcnow()
+    pairs = [(store_id, product_id) for store_id in store_ids for product_id in product_ids]
+    
+    # Random inventory quantities between 10-100, drawn in one call
+    quantities = random.choices(range(10, 101), k=len(pairs))
+    ids = generate_uuids(len(pairs))
+    
+    records = [
+        {
+            "id": inventory_id,
+            "product_id": product_id,
+            "store_id": store_id,
+            "available_quantity": total_quantity,
+            "reserved_quantity": 0,
+            "total_quantity": total_quantity,
+            "version": 1,
+            "last_updated": now
+        }
+        for inventory_id, (store_id, product_id), total_quantity in zip(ids, pairs, quantities)
+    ]
     
-    for store in stores:
-        for product in products:
-            # Random inventory quantities between 10-100
-            import random
-            total_quantity = random.randint(10, 100)
-            available_quantity = total_quantity
-            reserved_quantity = 0
-            
-            inventory = InventoryDB(
-                id=str(uuid.uuid4()),
-                product_id=product.id,
-                store_id=store.id,
-                available_quantity=available_quantity,
-                reserved_quantity=reserved_quantity,
-                total_quantity=total_quantity,
-                version=1,
-                last_updated=datetime.utcnow()
-            )
-            session.add(inventory)
-            inventory_count += 1
+    # Single executemany INSERT instead of one ORM flush per row
+    if records:
+        await session.execute(insert(InventoryDB), records)
     
-    print(f"✅ Created {inventory_count} inventory records")
+    print(f"✅ Created {len(records)} inventory records")
 
 
 async def main():
     """Main seed data function"""
     print("🌱 Seeding database with sample data...")
     
-    async with AsyncSessionLocal() as session:
-        try:
-            # Create products
-            products = await create_sample_products(session)
-            
-            # Create stores
-            stores = await create_sample_stores(session)
-            
-            # Commit products and stores first
-            await session.commit()
-            
-            # Create inventory
-            await create_sample_inventory(session, products, stores)
-            
-            # Commit inventory changes
-            await session.commit()
-            print("✅ Database seeded successfully!")
-            
-        except Exception as e:
-            await session.rollback()
-            print(f"❌ Error seeding database: {e}")
-            raise
+    try:
+        async with AsyncSessionLocal() as session:
+            try:
+                # Create products
+                product_ids = await create_sample_products(session)
+                
+                # Create stores
+                store_ids = await create_sample_stores(session)
+                
+                # Commit products and stores first
+                await session.commit()
+                
+                # Create inventory
+                await create_sample_inventory(session, product_ids, store_ids)
+                
+                # Commit inventory changes
+                await session.commit()
+                print("✅ Database seeded successfully!")
+                
+            except Exception as e:
+                await session.rollback()
+                print(f"❌ Error seeding database: {e}")
+                raise
+    finally:
+        # Release pooled connections so the script exits cleanly, even after a failure
+        await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import time
+import orjson
 from src.utils.database import get_db
-from src.config.event_bus_config import event_bus_config
 from src.utils.prometheus import prometheus_metrics
 from src.utils.logging import get_logger
 
@@ -10,25 +13,39 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/health", tags=["health"])
 
+_timestamp_cache = {"second": None, "iso": None}
+_health_body_cache = {"iso": None, "body": None}
 
-@router.get("/")
+
+def _iso_now_cached() -> str:
+    now = int(time.time())
+    if _timestamp_cache["second"] != now:
+        _timestamp_cache["second"] = now
+        _timestamp_cache["iso"] = datetime.utcfromtimestamp(now).isoformat()
+    return _timestamp_cache["iso"]
+
+
+@router.get("/", include_in_schema=False)
 async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "inventory-management"
-    }
+    iso = _iso_now_cached()
+    if _health_body_cache["iso"] != iso:
+        _health_body_cache["iso"] = iso
+        _health_body_cache["body"] = orjson.dumps({
+            "status": "healthy",
+            "timestamp": iso,
+            "service": "inventory-management"
+        })
+    return Response(content=_health_body_cache["body"], media_type="application/json")
 
 
-@router.get("/ready")
-async def readiness_check(db: AsyncSession = Depends(get_db)):
+@router.get("/ready", include_in_schema=False)
+async def readiness_check(request: Request, db: AsyncSession = Depends(get_db)):
     try:
-        await db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         try:
-            event_bus = event_bus_config.get_event_bus()
-            await event_bus.connect()
+            event_bus = request.app.state.event_bus
+            await event_bus.redis.ping()
             redis_connected = True
-            await event_bus.close()
         except Exception as e:
             logger.warning(f"Redis connection test failed: {e}")
             redis_connected = False
@@ -36,7 +53,7 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
         if redis_connected:
             return {
                 "status": "ready",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _iso_now_cached(),
                 "database": "connected",
                 "redis": "connected"
             }
@@ -44,7 +61,7 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
             logger.warning("Redis ping failed - service degraded")
             return {
                 "status": "not_ready",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _iso_now_cached(),
                 "database": "connected",
                 "redis": "disconnected"
             }
@@ -52,11 +69,20 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
         logger.error(f"Health check failed: {e}")
         return {
             "status": "not_ready",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _iso_now_cached(),
             "error": str(e)
         }
 
 
-@router.get("/metrics")
-async def get_metrics():
-    return prometheus_metrics.get_metrics()
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    # Content-Type set verbatim: CONTENT_TYPE_LATEST already carries the charset, which
+    # Starlette would append again when given as media_type. Both encodings share one
+    # URL, so both responses vary on Accept-Encoding.
+    headers = {"Content-Type": CONTENT_TYPE_LATEST, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=prometheus_metrics.get_metrics_gzip(),
+            headers={**headers, "Content-Encoding": "gzip"}
+        )
+    return Response(content=prometheus_metrics.get_metrics(), headers=headers)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import AsyncIterator, List, Optional
+import orjson
 
 from src.utils.database import get_db
 from src.services.inventory_service import InventoryService
-from src.config.event_bus_config import event_bus_config
 from src.models.inventory import (
     ReservationRequest, ReservationResponse, StockUpdate, 
     StockLevel, InventoryEvent, Product, Inventory
@@ -19,20 +21,17 @@ from src.utils.error_utils import handle_service_exception
 logger = get_logger(__name__)
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
+STREAM_CHUNK_ITEMS = 256
 
-async def get_inventory_service(db: AsyncSession = Depends(get_db)):
-    event_bus = event_bus_config.get_event_bus()
-    await event_bus.connect()
-    
-    lock_manager = event_bus_config.get_lock_manager(event_bus)
-    cache_manager = event_bus_config.get_cache_manager(event_bus)
-    
-    return InventoryService(db, event_bus, lock_manager, cache_manager)
+
+async def get_inventory_service(request: Request) -> InventoryService:
+    return request.app.state.inventory_service
 
 
 @router.post("/reserve", response_model=ReservationResponse)
 async def reserve_stock(
     request: ReservationRequestSchema,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
     try:
@@ -43,7 +42,7 @@ async def reserve_stock(
             quantity=request.quantity,
             ttl_minutes=request.ttl_minutes
         )
-        result = await service.reserve_stock(reservation_request)
+        result = await service.reserve_stock(db, reservation_request)
         
         logger.info(
             "Stock reservation successful",
@@ -65,15 +64,17 @@ async def reserve_stock(
 @router.post("/confirm")
 async def confirm_reservation(
     request: ReservationConfirmSchema,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
+    reservation_id = str(request.reservation_id)
     try:
-        success = await service.confirm_reservation(request.reservation_id)
+        success = await service.confirm_reservation(db, request.reservation_id)
         
         if success:
             logger.info(
                 "Reservation confirmed",
-                reservation_id=str(request.reservation_id)
+                reservation_id=reservation_id
             )
             return {"message": "Reservation confirmed successfully"}
         else:
@@ -86,7 +87,7 @@ async def confirm_reservation(
         logger.error(
             "Reservation confirmation failed",
             error=str(e),
-            reservation_id=str(reservation_id)
+            reservation_id=reservation_id
         )
         raise handle_service_exception(e)
 
@@ -94,10 +95,11 @@ async def confirm_reservation(
 @router.post("/cancel/{reservation_id}")
 async def cancel_reservation(
     reservation_id: str,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
     try:
-        success = await service.cancel_reservation(reservation_id)
+        success = await service.cancel_reservation(db, reservation_id)
         
         if success:
             logger.info(
@@ -124,10 +126,11 @@ async def cancel_reservation(
 async def get_stock_level(
     product_id: str,
     store_id: str,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
     try:
-        stock_level = await service.get_stock_level(product_id, store_id)
+        stock_level = await service.get_stock_level(db, product_id, store_id)
         
         if not stock_level:
             raise HTTPException(
@@ -155,6 +158,7 @@ async def get_stock_level(
 @router.post("/update-stock")
 async def update_stock(
     stock_update: StockUpdateSchema,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
     try:
@@ -166,7 +170,7 @@ async def update_stock(
             quantity_change=stock_update.quantity if stock_update.operation == "add" else -stock_update.quantity,
             reason=reason
         )
-        success = await service.update_stock(stock_update_model)
+        success = await service.update_stock(db, stock_update_model)
         
         if success:
             logger.info(
@@ -193,9 +197,12 @@ async def update_stock(
 
 
 @router.get("/products/", response_model=List[Product])
-async def get_products(service: InventoryService = Depends(get_inventory_service)):
+async def get_products(
+    db: AsyncSession = Depends(get_db),
+    service: InventoryService = Depends(get_inventory_service)
+):
     try:
-        products = await service.get_all_products()
+        products = await service.get_all_products(db)
         return products
     except Exception as e:
         logger.error("Error getting products", error=str(e))
@@ -205,11 +212,38 @@ async def get_products(service: InventoryService = Depends(get_inventory_service
         )
 
 
+async def _stream_json_array(items: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    # Emit the array in chunks so memory stays flat regardless of table size
+    chunk = [b"["]
+    separator = b""
+    async for item in items:
+        chunk.append(separator)
+        chunk.append(orjson.dumps(item.model_dump()))
+        separator = b","
+        if len(chunk) >= STREAM_CHUNK_ITEMS * 2:
+            yield b"".join(chunk)
+            chunk = []
+    chunk.append(b"]")
+    yield b"".join(chunk)
+
+
 @router.get("/all", response_model=List[Inventory])
-async def get_inventory(service: InventoryService = Depends(get_inventory_service)):
+async def get_inventory(
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    after_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    service: InventoryService = Depends(get_inventory_service)
+):
     try:
-        inventory = await service.get_all_inventory()
-        return inventory
+        if limit is None:
+            return StreamingResponse(
+                _stream_json_array(service.stream_all_inventory(db)),
+                media_type="application/json"
+            )
+        
+        inventory = await service.get_inventory_page(db, limit, after_id)
+        # Items are already validated models; skip response_model re-validation
+        return ORJSONResponse([item.model_dump() for item in inventory])
     except Exception as e:
         logger.error("Error getting inventory", error=str(e))
         raise HTTPException(
@@ -221,10 +255,11 @@ async def get_inventory(service: InventoryService = Depends(get_inventory_servic
 @router.post("/consume", status_code=status.HTTP_200_OK)
 async def consume_reservation(
     request: ReservationConsumeSchema,
+    db: AsyncSession = Depends(get_db),
     service: InventoryService = Depends(get_inventory_service)
 ):
     try:
-        success = await service.consume_reservation(request.reservation_id)
+        success = await service.consume_reservation(db, request.reservation_id)
         
         if success:
             return {"message": "Reservation consumed successfully - stock updated"}
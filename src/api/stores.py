@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from src.utils.database import get_db
 from src.services.store_service import StoreService
-from src.config.event_bus_config import event_bus_config
 from src.models.store import Store, StoreInventory
 from src.utils.logging import get_logger
 from src.utils.error_utils import handle_service_exception
@@ -13,20 +13,19 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/stores", tags=["stores"])
 
 
-async def get_store_service(db: AsyncSession = Depends(get_db)):
-    event_bus = event_bus_config.get_event_bus()
-    await event_bus.connect()
-    
-    return StoreService(db, event_bus)
+async def get_store_service(request: Request) -> StoreService:
+    return request.app.state.store_service
 
 
 @router.get("/", response_model=List[Store])
 async def get_all_stores(
+    db: AsyncSession = Depends(get_db),
     service: StoreService = Depends(get_store_service)
 ):
     try:
-        stores = await service.get_all_stores()
-        return stores
+        stores = await service.get_all_stores(db)
+        # Items are already validated models; skip response_model re-validation
+        return ORJSONResponse([store.model_dump() for store in stores])
         
     except Exception as e:
         logger.error(
@@ -42,10 +41,11 @@ async def get_all_stores(
 @router.get("/{store_id}", response_model=Store)
 async def get_store(
     store_id: str,
+    db: AsyncSession = Depends(get_db),
     service: StoreService = Depends(get_store_service)
 ):
     try:
-        store = await service.get_store(store_id)
+        store = await service.get_store(db, store_id)
         
         if not store:
             raise HTTPException(
@@ -72,10 +72,11 @@ async def get_store(
 @router.get("/{store_id}/inventory", response_model=List[StoreInventory])
 async def get_store_inventory(
     store_id: str,
+    db: AsyncSession = Depends(get_db),
     service: StoreService = Depends(get_store_service)
 ):
     try:
-        inventory = await service.get_store_inventory(store_id)
+        inventory = await service.get_store_inventory(db, store_id)
         return inventory
         
     except Exception as e:
@@ -1,3 +1,4 @@
+from typing import Optional
 from src.interfaces.event_bus import EventBus, LockManager, CacheManager
 from src.implementations.redis_event_bus import (
     RedisEventBus, RedisLockManager, RedisCacheManager
@@ -6,10 +7,12 @@ from src.implementations.redis_event_bus import (
 
 class EventBusConfig:    
     def __init__(self):
-        pass
+        self._event_bus: Optional[EventBus] = None
     
     def get_event_bus(self) -> EventBus:
-        return RedisEventBus()
+        if self._event_bus is None:
+            self._event_bus = RedisEventBus()
+        return self._event_bus
     
     def get_lock_manager(self, event_bus: EventBus) -> LockManager:
         if isinstance(event_bus, RedisEventBus):
@@ -2,150 +2,122 @@ from typing import Optional
 from src.constants import *
 
 
-class InventoryServiceBaseException(Exception):    
-    def __init__(self, status_code: int, error_type: str, message: str, error_code: Optional[str] = None):
-        self.status_code = status_code
-        self.error_type = error_type
+class InventoryServiceBaseException(Exception):
+    status_code = RESP_INTERNAL_SERVER_ERROR
+    error_type = SERVER_ERROR
+    default_error_code: Optional[str] = None
+    retryable = False
+
+    def __init__(self, message: str, error_code: Optional[str] = None):
         self.error_msg = message
-        self.error_code = error_code
-        super().__init__(self.error_msg)
+        self.error_code = error_code or self.default_error_code
+        super().__init__(message)
 
 
-class BusinessError(InventoryServiceBaseException):    
-    def __init__(self, message: str, error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_BAD_REQUEST,
-            error_type=BUSINESS_ERROR,
-            message=message,
-            error_code=error_code
-        )
+class BusinessError(InventoryServiceBaseException):
+    status_code = RESP_BAD_REQUEST
+    error_type = BUSINESS_ERROR
 
 
-class ValidationError(InventoryServiceBaseException):    
-    def __init__(self, message: str, error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_UNPROCESSABLE_ENTITY,
-            error_type=VALIDATION_ERROR,
-            message=message,
-            error_code=error_code
-        )
+class ValidationError(InventoryServiceBaseException):
+    status_code = RESP_UNPROCESSABLE_ENTITY
+    error_type = VALIDATION_ERROR
 
 
-class NotFoundError(InventoryServiceBaseException):    
-    def __init__(self, message: str, error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_NOT_FOUND,
-            error_type=NOT_FOUND_ERROR,
-            message=message,
-            error_code=error_code
-        )
+class NotFoundError(InventoryServiceBaseException):
+    status_code = RESP_NOT_FOUND
+    error_type = NOT_FOUND_ERROR
 
 
-class ConflictError(InventoryServiceBaseException):    
-    def __init__(self, message: str, error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_CONFLICT,
-            error_type=CONFLICT_ERROR,
-            message=message,
-            error_code=error_code
-        )
+class ConflictError(InventoryServiceBaseException):
+    status_code = RESP_CONFLICT
+    error_type = CONFLICT_ERROR
 
 
-class ServerError(InventoryServiceBaseException):    
+class ServerError(InventoryServiceBaseException):
     def __init__(self, message: str = "Internal server error", error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_INTERNAL_SERVER_ERROR,
-            error_type=SERVER_ERROR,
-            message=message,
-            error_code=error_code
-        )
+        super().__init__(message, error_code)
 
 
-class ExternalServiceError(InventoryServiceBaseException):    
-    def __init__(self, message: str, error_code: Optional[str] = None):
-        super().__init__(
-            status_code=RESP_SERVICE_UNAVAILABLE,
-            error_type=EXTERNAL_SERVICE_ERROR,
-            message=message,
-            error_code=error_code
-        )
+class ExternalServiceError(InventoryServiceBaseException):
+    status_code = RESP_SERVICE_UNAVAILABLE
+    error_type = EXTERNAL_SERVICE_ERROR
 
 
 class InsufficientStockError(BusinessError):
+    default_error_code = INSUFFICIENT_STOCK
+
     def __init__(self, available: int, requested: int):
         super().__init__(
-            message=f"Insufficient stock available. Available: {available}, Requested: {requested}",
-            error_code=INSUFFICIENT_STOCK
+            f"Insufficient stock available. Available: {available}, Requested: {requested}"
         )
 
 
 class InventoryNotFoundError(NotFoundError):
+    default_error_code = INVENTORY_NOT_FOUND
+
     def __init__(self, product_id: str, store_id: str):
         super().__init__(
-            message=f"Inventory not found for product {product_id} in store {store_id}",
-            error_code=INVENTORY_NOT_FOUND
+            f"Inventory not found for product {product_id} in store {store_id}"
         )
 
 
 class ProductNotFoundError(NotFoundError):
+    default_error_code = PRODUCT_NOT_FOUND
+
     def __init__(self, product_id: str):
-        super().__init__(
-            message=f"Product not found: {product_id}",
-            error_code=PRODUCT_NOT_FOUND
-        )
+        super().__init__(f"Product not found: {product_id}")
 
 
 class StoreNotFoundError(NotFoundError):
+    default_error_code = STORE_NOT_FOUND
+
     def __init__(self, store_id: str):
-        super().__init__(
-            message=f"Store not found: {store_id}",
-            error_code=STORE_NOT_FOUND
-        )
+        super().__init__(f"Store not found: {store_id}")
 
 
 class ReservationNotFoundError(NotFoundError):
+    default_error_code = RESERVATION_NOT_FOUND
+
     def __init__(self, reservation_id: str):
-        super().__init__(
-            message=f"Reservation not found: {reservation_id}",
-            error_code=RESERVATION_NOT_FOUND
-        )
+        super().__init__(f"Reservation not found: {reservation_id}")
 
 
 class ReservationExpiredError(ConflictError):
+    default_error_code = RESERVATION_EXPIRED
+
     def __init__(self, reservation_id: str):
-        super().__init__(
-            message=f"Reservation {reservation_id} has expired",
-            error_code=RESERVATION_EXPIRED
-        )
+        super().__init__(f"Reservation {reservation_id} has expired")
 
 
 class ReservationAlreadyConfirmedError(ConflictError):
+    default_error_code = RESERVATION_ALREADY_CONFIRMED
+
     def __init__(self, reservation_id: str):
-        super().__init__(
-            message=f"Reservation {reservation_id} is already confirmed",
-            error_code=RESERVATION_ALREADY_CONFIRMED
-        )
+        super().__init__(f"Reservation {reservation_id} is already confirmed")
 
 
 class OptimisticLockConflictError(ConflictError):
+    default_error_code = OPTIMISTIC_LOCK_CONFLICT
+    retryable = True
+
     def __init__(self, resource: str):
         super().__init__(
-            message=f"Optimistic lock conflict on {resource}. Resource was modified by another operation",
-            error_code=OPTIMISTIC_LOCK_CONFLICT
+            f"Optimistic lock conflict on {resource}. Resource was modified by another operation"
         )
 
 
 class DistributedLockFailedError(ExternalServiceError):
+    default_error_code = DISTRIBUTED_LOCK_FAILED
+
     def __init__(self, lock_key: str):
-        super().__init__(
-            message=f"Could not acquire distributed lock: {lock_key}",
-            error_code=DISTRIBUTED_LOCK_FAILED
-        )
+        super().__init__(f"Could not acquire distributed lock: {lock_key}")
 
 
 class InvalidReservationStatusError(BusinessError):
+    default_error_code = INVALID_RESERVATION_STATUS
+
     def __init__(self, reservation_id: str, current_status: str, expected_status: str):
         super().__init__(
-            message=f"Invalid reservation status for {reservation_id}. Current: {current_status}, Expected: {expected_status}",
-            error_code=INVALID_RESERVATION_STATUS
+            f"Invalid reservation status for {reservation_id}. Current: {current_status}, Expected: {expected_status}"
         )
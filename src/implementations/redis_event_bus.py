@@ -1,43 +1,130 @@
-import json
-from typing import Dict, Any, Optional, AsyncGenerator
-from src.interfaces.event_bus import EventBus, LockManager, CacheManager
+import asyncio
+import random
+import secrets
+import msgspec
+import zstandard
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple, Type, TypeVar, Union
+from src.interfaces.event_bus import EventBus, EventMessage, LockManager, CacheManager
 from src.utils.logging import get_logger
 import redis.asyncio as redis
-from config.settings import settings
+from redis.exceptions import ResponseError
+from config.settings import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Publishing may hold at most half the Redis pool (and never more than 16 pipelines),
+# leaving the rest for cache and lock traffic whatever the pool is sized to
+MAX_CONCURRENT_PUBLISHES = max(1, min(16, settings.redis_max_connections // 2))
+STREAM_MAXLEN = 100_000
+STREAM_READ_COUNT = 256
+STREAM_READ_BLOCK_MS = 100
+
+LOCK_RETRY_BASE_DELAY = 0.001
+LOCK_RETRY_MAX_DELAY = 0.2
+
+CACHE_COMPRESSION_THRESHOLD = 1024
+_CODEC_MSGPACK = b"\x00"
+_CODEC_MSGPACK_ZSTD = b"\x01"
+
+_encoder = msgspec.msgpack.Encoder()
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+# Delete the lock only if it still holds our token, so an expired lock re-acquired
+# by another owner is never released by us
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+else
+    return 0
+end
+"""
+
+
+def _encode_cache_value(value: Any) -> bytes:
+    packed = _encoder.encode(value)
+    if len(packed) > CACHE_COMPRESSION_THRESHOLD:
+        return _CODEC_MSGPACK_ZSTD + _compressor.compress(packed)
+    return _CODEC_MSGPACK + packed
+
+
+def _decode_cache_value(data: bytes, type: Optional[Type] = None) -> Any:
+    codec, body = data[:1], memoryview(data)[1:]
+    if codec == _CODEC_MSGPACK_ZSTD:
+        body = _decompressor.decompress(body)
+    if type is not None:
+        return msgspec.msgpack.decode(body, type=type)
+    return msgspec.msgpack.decode(body)
 
 
 class RedisEventBus(EventBus):
     
     def __init__(self):
+        self.pool: Optional[redis.BlockingConnectionPool] = None
         self.redis: Optional[redis.Redis] = None
+        self._publish_slots = asyncio.Semaphore(MAX_CONCURRENT_PUBLISHES)
     
     async def connect(self):
         try:
-            self.redis = redis.from_url(
+            # One bounded pool shared by publishing, locks and cache. Responses stay
+            # as bytes since cache values are binary-framed.
+            self.pool = redis.BlockingConnectionPool.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
+                max_connections=settings.redis_max_connections,
+                health_check_interval=settings.redis_health_check_interval,
+                socket_timeout=settings.redis_socket_timeout,
+                socket_keepalive=True,
+                decode_responses=False
             )
+            self.redis = redis.Redis(connection_pool=self.pool)
             await self.redis.ping()
             logger.info("Connected to Redis Event Bus")
         except Exception as e:
             logger.error(f"Failed to connect to Redis Event Bus: {e}")
             raise
     
-    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
-        try:
-            await self.redis.publish(topic, json.dumps(message))
-            logger.debug(f"Published message to topic {topic}")
-        except Exception as e:
-            logger.error(f"Failed to publish message to topic {topic}: {e}")
-            raise
+    async def publish(self, topic: str, message: Union[Dict[str, Any], bytes]) -> None:
+        payload = message if isinstance(message, bytes) else _encoder.encode(message)
+        await self.publish_many([(topic, payload)])
+    
+    async def publish_many(self, messages: List[Tuple[str, bytes]]) -> None:
+        # Events reach this through the outbox relay, which batches and retries; concurrent
+        # batches are capped so publishing never drains the shared pool
+        async with self._publish_slots:
+            pipe = self.redis.pipeline(transaction=False)
+            for topic, payload in messages:
+                pipe.xadd(topic, {b"d": payload}, maxlen=STREAM_MAXLEN, approximate=True)
+            await pipe.execute()
     
+    async def consume(
+        self, topic: str, group: str, consumer: str
+    ) -> AsyncGenerator[EventMessage, None]:
+        try:
+            await self.redis.xgroup_create(topic, group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        
+        while True:
+            response = await self.redis.xreadgroup(
+                group, consumer, {topic: ">"},
+                count=STREAM_READ_COUNT,
+                block=STREAM_READ_BLOCK_MS
+            )
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    # Same schema the outbox encoded with, so timestamps come back as datetimes
+                    yield msgspec.msgpack.decode(fields[b"d"], type=EventMessage)
+                    await self.redis.xack(topic, group, entry_id)
     
     async def close(self) -> None:
         if self.redis:
             await self.redis.close()
+            await self.pool.disconnect()
             logger.info("Redis Event Bus connection closed")
 
 
@@ -45,17 +132,30 @@ class RedisLockManager(LockManager):
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
+        self._unlock = redis_client.register_script(_UNLOCK_SCRIPT)
     
-    async def acquire_lock(self, key: str, ttl: int = 30) -> bool:
+    async def acquire_lock(self, key: str, ttl: int = 30, wait_timeout: float = 0.0) -> Optional[str]:
+        token = secrets.token_hex(16)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_timeout
+        delay = LOCK_RETRY_BASE_DELAY
         try:
-            return await self.redis.set(key, "locked", nx=True, ex=ttl)
+            while True:
+                if await self.redis.set(key, token, nx=True, ex=ttl):
+                    return token
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                # Jittered exponential backoff keeps contending workers from polling in lockstep
+                await asyncio.sleep(min(delay * (0.5 + random.random() * 0.5), remaining))
+                delay = min(delay * 2, LOCK_RETRY_MAX_DELAY)
         except Exception as e:
             logger.error(f"Redis lock acquisition failed for key {key}: {e}")
-            return False
+            return None
     
-    async def release_lock(self, key: str) -> None:
+    async def release_lock(self, key: str, token: str) -> None:
         try:
-            await self.redis.delete(key)
+            await self._unlock(keys=[key], args=[token])
         except Exception as e:
             logger.error(f"Redis lock release failed for key {key}: {e}")
 
@@ -65,17 +165,25 @@ class RedisCacheManager(CacheManager):
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
     
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[Any]:
         try:
-            return await self.redis.get(key)
+            data = await self.redis.get(key)
+            return _decode_cache_value(data) if data is not None else None
+        except Exception as e:
+            logger.error(f"Redis get operation failed for key {key}: {e}")
+            return None
+    
+    async def get_typed(self, key: str, type: Type[T]) -> Optional[T]:
+        try:
+            data = await self.redis.get(key)
+            return _decode_cache_value(data, type) if data is not None else None
         except Exception as e:
             logger.error(f"Redis get operation failed for key {key}: {e}")
             return None
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+            value = _encode_cache_value(value)
             
             if ttl:
                 await self.redis.setex(key, ttl, value)
@@ -85,6 +193,42 @@ class RedisCacheManager(CacheManager):
             logger.error(f"Redis set operation failed for key {key}: {e}")
             raise
     
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(keys)
+            return [_decode_cache_value(data) if data is not None else None for data in values]
+        except Exception as e:
+            logger.error(f"Redis mget operation failed for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+    
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        if not mapping:
+            return
+        try:
+            encoded = {key: _encode_cache_value(value) for key, value in mapping.items()}
+            
+            if ttl:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, value in encoded.items():
+                    pipe.set(key, value, ex=ttl)
+                await pipe.execute()
+            else:
+                await self.redis.mset(encoded)
+        except Exception as e:
+            logger.error(f"Redis mset operation failed for {len(mapping)} keys: {e}")
+            raise
+    
+    async def mdelete(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        try:
+            await self.redis.delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis mdelete operation failed for {len(keys)} keys: {e}")
+            raise
+    
     async def delete(self, key: str) -> None:
         try:
             await self.redis.delete(key)
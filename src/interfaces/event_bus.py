@@ -1,15 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, AsyncGenerator
-from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple, Type, TypeVar, Union
+from datetime import datetime, timezone
+import msgspec
+
+T = TypeVar("T")
 
 
 class EventBus(ABC):
     
     @abstractmethod
-    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+    async def publish(self, topic: str, message: Union[Dict[str, Any], bytes]) -> None:
         pass
     
     
+    @abstractmethod
+    async def publish_many(self, messages: List[Tuple[str, bytes]]) -> None:
+        pass
+    
+    @abstractmethod
+    def consume(self, topic: str, group: str, consumer: str) -> AsyncGenerator["EventMessage", None]:
+        pass
+    
     @abstractmethod
     async def close(self) -> None:
         pass
@@ -18,16 +29,20 @@ class EventBus(ABC):
 class LockManager(ABC):
     
     @abstractmethod
-    async def acquire_lock(self, key: str, ttl: int = 30) -> bool:
+    async def acquire_lock(self, key: str, ttl: int = 30, wait_timeout: float = 0.0) -> Optional[str]:
         pass
     
     @abstractmethod
-    async def release_lock(self, key: str) -> None:
+    async def release_lock(self, key: str, token: str) -> None:
         pass
 
 class CacheManager(ABC):    
     @abstractmethod
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[Any]:
+        pass
+    
+    @abstractmethod
+    async def get_typed(self, key: str, type: Type[T]) -> Optional[T]:
         pass
     
     @abstractmethod
@@ -41,23 +56,29 @@ class CacheManager(ABC):
     @abstractmethod
     async def exists(self, key: str) -> bool:
         pass
+    
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        pass
+    
+    @abstractmethod
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        pass
+    
+    @abstractmethod
+    async def mdelete(self, keys: List[str]) -> None:
+        pass
+
+
+_encoder = msgspec.msgpack.Encoder()
 
 
-class EventMessage:
-    
-    def __init__(
-        self,
-        event_type: str,
-        payload: Dict[str, Any],
-        timestamp: Optional[datetime] = None,
-        source: str = "inventory_service",
-        version: str = "1.0"
-    ):
-        self.event_type = event_type
-        self.payload = payload
-        self.timestamp = timestamp or datetime.utcnow()
-        self.source = source
-        self.version = version
+class EventMessage(msgspec.Struct, gc=False):
+    event_type: str
+    payload: Dict[str, Any]
+    timestamp: datetime = msgspec.field(default_factory=lambda: datetime.now(timezone.utc))
+    source: str = "inventory_service"
+    version: str = "1.0"
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -68,3 +89,5 @@ class EventMessage:
             "version": self.version
         }
     
+    def to_msgpack(self) -> bytes:
+        return _encoder.encode(self)
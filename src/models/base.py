@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class BaseEntity(BaseModel):
@@ -9,12 +9,13 @@ class BaseEntity(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_encoders={
             datetime: lambda v: v.isoformat(),
             UUID: lambda v: str(v)
         }
+    )
 
 
 class Event(BaseEntity):
@@ -26,5 +27,4 @@ class Event(BaseEntity):
     causation_id: Optional[str] = None
     version: int = 1
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
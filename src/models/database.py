@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Index
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, LargeBinary, ForeignKey, Index, cast
+from sqlalchemy.orm import relationship, column_property
+from sqlalchemy.sql import func, text
 from src.utils.database import Base
 import uuid
 
@@ -14,6 +14,8 @@ class ProductDB(Base):
     description = Column(Text)
     category = Column(String(100), nullable=False, index=True)
     unit_price = Column(Integer, nullable=False)
+    # Stored in cents; the database does the conversion to currency units on load
+    unit_price_units = column_property(cast(unit_price, Float) / 100)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -41,7 +43,8 @@ class InventoryDB(Base):
     __tablename__ = "inventory"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    product_id = Column(String(36), ForeignKey("products.id"), nullable=False, index=True)
+    # product_id lookups are served by the leading column of idx_inventory_product_store
+    product_id = Column(String(36), ForeignKey("products.id"), nullable=False)
     store_id = Column(String(36), ForeignKey("stores.id"), nullable=False, index=True)
     available_quantity = Column(Integer, nullable=False, default=0)
     reserved_quantity = Column(Integer, nullable=False, default=0)
@@ -49,8 +52,9 @@ class InventoryDB(Base):
     version = Column(Integer, nullable=False, default=1)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    product = relationship("ProductDB", back_populates="inventories")
-    store = relationship("StoreDB", back_populates="inventories")
+    # Inventory DTOs only need the FK columns; raise instead of lazy-loading per row
+    product = relationship("ProductDB", back_populates="inventories", lazy="raise")
+    store = relationship("StoreDB", back_populates="inventories", lazy="raise")
 
     __table_args__ = (
         Index('idx_inventory_product_store', 'product_id', 'store_id', unique=True),
@@ -61,7 +65,8 @@ class ReservationDB(Base):
     __tablename__ = "reservations"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    order_id = Column(String(50), nullable=False, index=True)
+    # order_id lookups are served by the leading column of idx_reservation_order_status
+    order_id = Column(String(50), nullable=False)
     product_id = Column(String(36), nullable=False)
     store_id = Column(String(36), nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -72,9 +77,14 @@ class ReservationDB(Base):
     cancelled_at = Column(DateTime(timezone=True))
 
     __table_args__ = (
-        Index('idx_reservation_order', 'order_id'),
+        Index('idx_reservation_order_status', 'order_id', 'status'),
         Index('idx_reservation_product_store', 'product_id', 'store_id'),
-        Index('idx_reservation_status', 'status'),
+        Index(
+            'idx_reservation_pending_expiry',
+            'expires_at',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
     )
 
 
@@ -83,7 +93,8 @@ class EventDB(Base):
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     event_type = Column(String(50), nullable=False)
-    payload = Column(Text, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    content_type = Column(String(16), nullable=False, default="msgpack")
     version = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -92,3 +103,28 @@ class EventDB(Base):
         Index('idx_event_created_at', 'created_at'),
     )
 
+
+
+class OutboxEventDB(Base):
+    __tablename__ = "event_outbox"
+
+    # Autoincrement key is the relay order; created_at has one-second resolution on SQLite
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic = Column(String(100), nullable=False)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_by = Column(String(32))
+    claimed_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index(
+            'idx_outbox_unpublished',
+            'id',
+            postgresql_where=text("published_at IS NULL"),
+            sqlite_where=text("published_at IS NULL"),
+        ),
+        Index('idx_outbox_published_at', 'published_at'),
+        {"sqlite_autoincrement": True},
+    )
@@ -1,9 +1,17 @@
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
 from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+import time
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from enum import Enum
 
 
+def as_utc(value: datetime) -> datetime:
+    # Naive datetimes in this service are UTC (SQLite drops the offset)
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
 class ReservationStatus(str, Enum):
     PENDING = "pending"
     CONFIRMED = "confirmed"
@@ -22,8 +30,7 @@ class Product(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Inventory(BaseModel):
@@ -32,24 +39,19 @@ class Inventory(BaseModel):
     store_id: str
     available_quantity: int = Field(..., ge=0)
     reserved_quantity: int = Field(..., ge=0)
-    total_quantity: int = Field(..., ge=0)
     version: int = Field(default=1, ge=1)
     last_updated: datetime
     
-    @validator('total_quantity')
-    def validate_total_quantity(cls, v, values):
-        available = values.get('available_quantity', 0)
-        reserved = values.get('reserved_quantity', 0)
-        if v != available + reserved:
-            raise ValueError('Total quantity must equal available + reserved')
-        return v
+    @computed_field
+    @property
+    def total_quantity(self) -> int:
+        return self.available_quantity + self.reserved_quantity
     
     @property
     def is_available(self) -> bool:
         return self.available_quantity > 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Reservation(BaseModel):
@@ -64,19 +66,26 @@ class Reservation(BaseModel):
     confirmed_at: Optional[datetime] = None
     cancelled_at: Optional[datetime] = None
     
+    @cached_property
+    def expires_at_ts(self) -> float:
+        return as_utc(self.expires_at).timestamp()
+    
+    def expired_at(self, now_ts: Optional[float] = None) -> bool:
+        return (time.time() if now_ts is None else now_ts) > self.expires_at_ts
+    
     @property
     def is_expired(self) -> bool:
-        return datetime.utcnow() > self.expires_at
+        return self.expired_at()
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class StockUpdate(BaseModel):
+@dataclass(slots=True, frozen=True)
+class StockUpdate:
     product_id: str
     store_id: str
     quantity_change: int
-    reason: str = Field(..., min_length=1, max_length=200)
+    reason: str
     reference_id: Optional[str] = None
 
 
@@ -95,7 +104,8 @@ class ReservationResponse(BaseModel):
     message: str
 
 
-class StockLevel(BaseModel):
+@dataclass(slots=True, frozen=True)
+class StockLevel:
     product_id: str
     store_id: str
     available: int
@@ -104,7 +114,8 @@ class StockLevel(BaseModel):
     last_updated: datetime
 
 
-class InventoryEvent(BaseModel):
+@dataclass(slots=True, frozen=True)
+class InventoryEvent:
     event_type: str
     product_id: str
     store_id: str
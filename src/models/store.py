@@ -1,6 +1,7 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -24,11 +25,11 @@ class Store(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class StoreInventory(BaseModel):
+@dataclass(slots=True, frozen=True)
+class StoreInventory:
     store_id: str
     product_id: str
     available_quantity: int
@@ -1,23 +1,40 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Literal, Optional
+from uuid import UUID
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, StringConstraints, field_validator
 import re
 
+_ORDER_ID_PATTERN = r'^[A-Z0-9\-_]+$'
+_SKU_PATTERN = r'^[A-Z0-9\-_]+$'
+_SKU_RE = re.compile(_SKU_PATTERN)
+
+
+def _validate_uuid(v: str) -> str:
+    try:
+        return str(UUID(v))
+    except ValueError:
+        raise ValueError('ID must be a valid UUID')
+
+
+UUIDStr = Annotated[str, AfterValidator(_validate_uuid)]
+# Pattern check runs inside pydantic-core instead of a Python validator
+OrderIdStr = Annotated[str, StringConstraints(pattern=_ORDER_ID_PATTERN)]
+
 
 class ReservationRequestSchema(BaseModel):
-    order_id: str = Field(
+    order_id: OrderIdStr = Field(
         ..., 
         min_length=1, 
         max_length=50,
         description="Unique order ID from the client"
     )
-    product_id: str = Field(
+    product_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
         description="ID of the product to reserve"
     )
-    store_id: str = Field(
+    store_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
@@ -36,28 +53,9 @@ class ReservationRequestSchema(BaseModel):
         description="Reservation time-to-live in minutes (1-60)"
     )
 
-    @validator('order_id')
-    def validate_order_id(cls, v):
-        if not re.match(r'^[A-Z0-9-_]+$', v):
-            raise ValueError('Order ID must contain only uppercase letters, numbers, hyphens and underscores')
-        return v
-
-    @validator('product_id', 'store_id')
-    def validate_uuid_format(cls, v):
-        if not re.match(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$', v):
-            raise ValueError('ID must be a valid UUID')
-        return v
-
-    @validator('quantity')
-    def validate_quantity(cls, v):
-        if v <= 0:
-            raise ValueError('Quantity must be greater than 0')
-        if v > 100:
-            raise ValueError('Quantity cannot be greater than 100')
-        return v
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "order_id": "ORDER-12345",
                 "product_id": "123e4567-e89b-12d3-a456-426614174000",
@@ -66,73 +64,58 @@ class ReservationRequestSchema(BaseModel):
                 "ttl_minutes": 15
             }
         }
+    )
 
 
 class ReservationConfirmSchema(BaseModel):
-    reservation_id: str = Field(
+    reservation_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
         description="ID of the reservation to confirm"
     )
-    order_id: str = Field(
+    order_id: OrderIdStr = Field(
         ..., 
         min_length=1, 
         max_length=50,
         description="Order ID (must match the reservation)"
     )
 
-    @validator('reservation_id')
-    def validate_reservation_id(cls, v):
-        if not re.match(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$', v):
-            raise ValueError('Reservation ID must be a valid UUID')
-        return v
-
-    @validator('order_id')
-    def validate_order_id(cls, v):
-        if not re.match(r'^[A-Z0-9-_]+$', v):
-            raise ValueError('Order ID must contain only uppercase letters, numbers, hyphens and underscores')
-        return v
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "reservation_id": "123e4567-e89b-12d3-a456-426614174002",
                 "order_id": "ORDER-12345"
             }
         }
+    )
 
 
 class ReservationConsumeSchema(BaseModel):
-    reservation_id: str = Field(
+    reservation_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
         description="ID of the reservation to consume"
     )
 
-    @validator('reservation_id')
-    def validate_reservation_id(cls, v):
-        if not re.match(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$', v):
-            raise ValueError('Reservation ID must be a valid UUID')
-        return v
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "reservation_id": "123e4567-e89b-12d3-a456-426614174002"
             }
         }
+    )
 
 
 class StockUpdateSchema(BaseModel):
-    product_id: str = Field(
+    product_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
         description="ID of the product"
     )
-    store_id: str = Field(
+    store_id: UUIDStr = Field(
         ..., 
         min_length=36, 
         max_length=36,
@@ -140,9 +123,11 @@ class StockUpdateSchema(BaseModel):
     )
     quantity: int = Field(
         ..., 
-        description="Quantity to add or subtract from stock"
+        gt=0,
+        le=1000,
+        description="Quantity to add or subtract from stock (1-1000)"
     )
-    operation: str = Field(
+    operation: Literal['add', 'subtract'] = Field(
         ..., 
         description="Operation to perform: 'add' or 'subtract'"
     )
@@ -153,28 +138,8 @@ class StockUpdateSchema(BaseModel):
         description="Reason for the stock update (optional)"
     )
 
-    @validator('product_id', 'store_id')
-    def validate_uuid_format(cls, v):
-        if not re.match(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$', v):
-            raise ValueError('ID must be a valid UUID')
-        return v
-
-    @validator('operation')
-    def validate_operation(cls, v):
-        if v not in ['add', 'subtract']:
-            raise ValueError('Operation must be "add" or "subtract"')
-        return v
-
-    @validator('quantity')
-    def validate_quantity(cls, v):
-        if v <= 0:
-            raise ValueError('Quantity must be greater than 0')
-        if v > 1000:
-            raise ValueError('Quantity cannot be greater than 1000')
-        return v
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "product_id": "123e4567-e89b-12d3-a456-426614174000",
                 "store_id": "123e4567-e89b-12d3-a456-426614174001",
@@ -182,6 +147,7 @@ class StockUpdateSchema(BaseModel):
                 "operation": "add"
             }
         }
+    )
 
 
 class ProductCreateSchema(BaseModel):
@@ -211,25 +177,19 @@ class ProductCreateSchema(BaseModel):
     unit_price: float = Field(
         ..., 
         gt=0,
+        le=1_000_000,
         description="Product unit price"
     )
 
-    @validator('sku')
+    @field_validator('sku')
+    @classmethod
     def validate_sku(cls, v):
-        if not re.match(r'^[A-Z0-9-_]+$', v):
+        if not _SKU_RE.match(v):
             raise ValueError('SKU must contain only uppercase letters, numbers, hyphens and underscores')
         return v
 
-    @validator('unit_price')
-    def validate_price(cls, v):
-        if v <= 0:
-            raise ValueError('Price must be greater than 0')
-        if v > 1000000:
-            raise ValueError('Price cannot be greater than 1,000,000')
-        return v
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "sku": "LAPTOP-001",
                 "name": "MacBook Pro 16-inch",
@@ -237,4 +197,5 @@ class ProductCreateSchema(BaseModel):
                 "category": "Electronics",
                 "unit_price": 2499.99
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
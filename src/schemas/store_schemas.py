@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import re
 
+_TEXT_RE = re.compile(r'^[a-zA-Z0-9\s\-\.]+$')
+_ZIP_CODE_RE = re.compile(r'^[A-Z0-9\s\-]+$')
+
 
 class StoreCreateSchema(BaseModel):
     name: str = Field(
@@ -34,20 +37,22 @@ class StoreCreateSchema(BaseModel):
         description="Store zip code"
     )
 
-    @validator('name', 'city', 'country')
+    @field_validator('name', 'city', 'country')
+    @classmethod
     def validate_text_fields(cls, v):
-        if not re.match(r'^[a-zA-Z0-9\s\-\.]+$', v):
+        if not _TEXT_RE.match(v):
             raise ValueError('Field must contain only letters, numbers, spaces, hyphens and dots')
         return v
 
-    @validator('zip_code')
+    @field_validator('zip_code')
+    @classmethod
     def validate_zip_code(cls, v):
-        if not re.match(r'^[A-Z0-9\s\-]+$', v):
+        if not _ZIP_CODE_RE.match(v):
             raise ValueError('zip code must contain only uppercase letters, numbers, spaces and hyphens')
         return v
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Downtown Store",
                 "address": "Main St 123",
@@ -56,3 +61,4 @@ class StoreCreateSchema(BaseModel):
                 "zip_code": "28001"
             }
         }
+    )
@@ -1,9 +1,21 @@
-from typing import Dict, Any
+import asyncio
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, List
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.interfaces.event_bus import EventBus, EventMessage
+from src.models.database import OutboxEventDB
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+OUTBOX_BATCH_SIZE = 256
+OUTBOX_POLL_INTERVAL_SECONDS = 0.5
+OUTBOX_CLAIM_LEASE_SECONDS = 30
+OUTBOX_RETENTION_SECONDS = 3600
+OUTBOX_PRUNE_INTERVAL_SECONDS = 60
+
 
 class EventService:
     def __init__(self, event_bus: EventBus):
@@ -23,7 +35,7 @@ class EventService:
                 source=source
             )
             
-            await self.event_bus.publish(topic, event_message.to_dict())
+            await self.event_bus.publish(topic, event_message.to_msgpack())
             
             logger.info(
                 "Event published successfully",
@@ -40,3 +52,118 @@ class EventService:
             )
             raise
     
+    def add_outbox_event(
+        self,
+        db: AsyncSession,
+        event_type: str,
+        payload: Dict[str, Any],
+        topic: str = "inventory_events",
+        source: str = "inventory_service"
+    ) -> None:
+        # Written in the caller's transaction; the relay publishes it after commit
+        event_message = EventMessage(
+            event_type=event_type,
+            payload=payload,
+            source=source
+        )
+        db.add(OutboxEventDB(
+            topic=topic,
+            event_type=event_type,
+            payload=event_message.to_msgpack()
+        ))
+    
+    async def relay_outbox(self, db: AsyncSession, limit: int = OUTBOX_BATCH_SIZE) -> int:
+        now = datetime.now(timezone.utc)
+        claim_token = secrets.token_hex(8)
+        # A claim older than the lease belongs to a relay that died mid-publish
+        claimable = and_(
+            OutboxEventDB.published_at.is_(None),
+            or_(
+                OutboxEventDB.claimed_at.is_(None),
+                OutboxEventDB.claimed_at < now - timedelta(seconds=OUTBOX_CLAIM_LEASE_SECONDS)
+            )
+        )
+        
+        # Claim the batch in one UPDATE so every worker's relay gets disjoint rows.
+        # SQLite drops SKIP LOCKED but serializes the UPDATE; on Postgres the guard is
+        # re-checked against rows another relay claimed first.
+        result = await db.execute(
+            update(OutboxEventDB)
+            .where(
+                and_(
+                    OutboxEventDB.id.in_(
+                        select(OutboxEventDB.id)
+                        .where(claimable)
+                        .order_by(OutboxEventDB.id)
+                        .limit(limit)
+                        .with_for_update(skip_locked=True)
+                    ),
+                    claimable
+                )
+            )
+            .values(claimed_by=claim_token, claimed_at=now)
+            .returning(OutboxEventDB.id, OutboxEventDB.topic, OutboxEventDB.payload)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING order is unspecified; publish in insertion order
+        rows = sorted(result.all(), key=lambda row: row.id)
+        await db.commit()
+        if not rows:
+            return 0
+        
+        ids = [row.id for row in rows]
+        try:
+            await self.event_bus.publish_many([(row.topic, row.payload) for row in rows])
+        except Exception:
+            # Hand the batch back now rather than waiting for the lease to run out
+            await self._set_claimed(db, ids, claim_token, claimed_by=None, claimed_at=None)
+            raise
+        
+        await self._set_claimed(db, ids, claim_token, published_at=datetime.now(timezone.utc))
+        logger.debug("Relayed outbox events", count=len(rows))
+        return len(rows)
+    
+    async def _set_claimed(self, db: AsyncSession, ids: List[int], claim_token: str, **values) -> None:
+        await db.execute(
+            update(OutboxEventDB)
+            .where(and_(OutboxEventDB.id.in_(ids), OutboxEventDB.claimed_by == claim_token))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    
+    async def prune_outbox(self, db: AsyncSession, retention_seconds: int = OUTBOX_RETENTION_SECONDS) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention_seconds)
+        result = await db.execute(
+            delete(OutboxEventDB)
+            .where(OutboxEventDB.published_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+    
+    async def run_outbox_relay(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float = OUTBOX_POLL_INTERVAL_SECONDS
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        next_prune = loop.time() + OUTBOX_PRUNE_INTERVAL_SECONDS
+        while True:
+            try:
+                async with session_factory() as db:
+                    relayed = await self.relay_outbox(db)
+                    if loop.time() >= next_prune:
+                        next_prune = loop.time() + OUTBOX_PRUNE_INTERVAL_SECONDS
+                        pruned = await self.prune_outbox(db)
+                        if pruned:
+                            logger.debug("Pruned published outbox events", count=pruned)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Outbox relay failed", error=str(e))
+                relayed = 0
+            
+            # Drain backlogs back to back; only idle when the outbox is caught up
+            if relayed < OUTBOX_BATCH_SIZE:
+                await asyncio.sleep(interval)
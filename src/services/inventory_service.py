@@ -1,68 +1,129 @@
-from datetime import datetime, timedelta
-from typing import Optional, List
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update, and_, bindparam, lambda_stmt, Row
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 
 from src.models.database import InventoryDB, ProductDB, StoreDB, ReservationDB, EventDB
 from src.models.inventory import (
     Inventory, Product, Reservation, ReservationRequest, 
-    ReservationResponse, ReservationStatus, StockUpdate, StockLevel
+    ReservationResponse, ReservationStatus, StockUpdate, StockLevel, as_utc
 )
 from src.interfaces.event_bus import EventBus, LockManager, CacheManager
 from src.services.event_service import EventService
 from src.utils.logging import get_logger
+from src.utils.error_utils import retry_on_optimistic_conflict
 from src.exceptions import (
     InsufficientStockError, InventoryNotFoundError, ProductNotFoundError,
     ReservationNotFoundError, ReservationExpiredError, ReservationAlreadyConfirmedError,
-    OptimisticLockConflictError, DistributedLockFailedError, InvalidReservationStatusError
+    OptimisticLockConflictError, InvalidReservationStatusError
 )
-from config.settings import settings
 
 logger = get_logger(__name__)
 
+MAX_CAS_ATTEMPTS = 5
+PRODUCT_CACHE_TTL_SECONDS = 60
+STOCK_CACHE_TTL_SECONDS = 5
+EXPIRY_BATCH_SIZE = 500
+EXPIRY_POLL_INTERVAL_SECONDS = 5.0
+INVENTORY_STREAM_BATCH_SIZE = 500
+HOT_KEY_CONCURRENCY = 4
+HOT_KEY_STRIPES = 256
+
+
+def _stock_cache_key(product_id: str, store_id: str) -> str:
+    return f"stock:{product_id}:{store_id}"
+
+
+_INVENTORY_COLUMNS = (
+    InventoryDB.id,
+    InventoryDB.product_id,
+    InventoryDB.store_id,
+    InventoryDB.available_quantity,
+    InventoryDB.reserved_quantity,
+    InventoryDB.version,
+    InventoryDB.last_updated
+)
+
+
+def _inventory_from_row(row: Row) -> Inventory:
+    # Rows come from our own table, so skip Pydantic re-validation
+    return Inventory.model_construct(
+        id=row.id,
+        product_id=row.product_id,
+        store_id=row.store_id,
+        available_quantity=row.available_quantity,
+        reserved_quantity=row.reserved_quantity,
+        version=row.version,
+        last_updated=row.last_updated
+    )
+
 
 class InventoryService:
     def __init__(
         self, 
-        db: AsyncSession, 
         event_bus: EventBus,
         lock_manager: LockManager,
         cache_manager: CacheManager
     ):
-        self.db = db
         self.event_bus = event_bus
         self.lock_manager = lock_manager
         self.cache_manager = cache_manager
         self.event_service = EventService(event_bus)
+        # Products are reference data with no write path in this service (only the seed
+        # script writes them); a process-local TTL cache is the only freshness bound
+        self._product_cache: Dict[str, Tuple[float, Product]] = {}
+        self._all_products_cache: Optional[Tuple[float, List[Product]]] = None
+        # Caps how many requests per (product, store) race the same inventory row at once.
+        # Fixed stripes rather than one semaphore per key, so request-supplied ids can't grow it.
+        self._key_slots: List[asyncio.Semaphore] = [
+            asyncio.Semaphore(HOT_KEY_CONCURRENCY) for _ in range(HOT_KEY_STRIPES)
+        ]
+    
+    def _key_slot(self, product_id: str, store_id: str) -> asyncio.Semaphore:
+        return self._key_slots[hash((product_id, store_id)) % HOT_KEY_STRIPES]
     
-    async def get_product(self, product_id: str) -> Optional[Product]:
-        result = await self.db.execute(
-            select(ProductDB).where(ProductDB.id == product_id)
+    async def get_product(self, db: AsyncSession, product_id: str) -> Optional[Product]:
+        cached = self._product_cache.get(product_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        result = await db.execute(
+            lambda_stmt(lambda: select(ProductDB).where(ProductDB.id == product_id))
         )
         product_db = result.scalar_one_or_none()
         if not product_db:
             return None
         
-        return Product(
+        product = Product(
             id=product_db.id,
             sku=product_db.sku,
             name=product_db.name,
             description=product_db.description,
             category=product_db.category,
-            unit_price=product_db.unit_price / 100,
+            unit_price=product_db.unit_price_units,
             created_at=product_db.created_at,
             updated_at=product_db.updated_at
         )
+        self._product_cache[product_id] = (time.monotonic() + PRODUCT_CACHE_TTL_SECONDS, product)
+        return product
     
-    async def get_inventory(self, product_id: str, store_id: str) -> Optional[Inventory]:
-        result = await self.db.execute(
-            select(InventoryDB)
-            .where(
-                and_(
-                    InventoryDB.product_id == product_id,
-                    InventoryDB.store_id == store_id
+    async def get_inventory(self, db: AsyncSession, product_id: str, store_id: str) -> Optional[Inventory]:
+        # lambda_stmt caches the constructed statement; only the bound ids vary per call
+        result = await db.execute(
+            lambda_stmt(
+                lambda: select(InventoryDB)
+                .where(
+                    and_(
+                        InventoryDB.product_id == product_id,
+                        InventoryDB.store_id == store_id
+                    )
                 )
             )
         )
@@ -76,17 +137,21 @@ class InventoryService:
             store_id=inventory_db.store_id,
             available_quantity=inventory_db.available_quantity,
             reserved_quantity=inventory_db.reserved_quantity,
-            total_quantity=inventory_db.total_quantity,
             version=inventory_db.version,
             last_updated=inventory_db.last_updated
         )
     
-    async def get_stock_level(self, product_id: str, store_id: str) -> Optional[StockLevel]:
-        inventory = await self.get_inventory(product_id, store_id)
+    async def get_stock_level(self, db: AsyncSession, product_id: str, store_id: str) -> Optional[StockLevel]:
+        cache_key = _stock_cache_key(product_id, store_id)
+        cached = await self.cache_manager.get_typed(cache_key, StockLevel)
+        if cached is not None:
+            return cached
+        
+        inventory = await self.get_inventory(db, product_id, store_id)
         if not inventory:
             return None
         
-        return StockLevel(
+        stock_level = StockLevel(
             product_id=inventory.product_id,
             store_id=inventory.store_id,
             available=inventory.available_quantity,
@@ -94,58 +159,79 @@ class InventoryService:
             total=inventory.total_quantity,
             last_updated=inventory.last_updated
         )
-    
-    async def reserve_stock(self, request: ReservationRequest) -> ReservationResponse:
-        lock_key = f"inventory_lock:{request.product_id}:{request.store_id}"
         
         try:
-            acquired = await self.lock_manager.acquire_lock(lock_key, ttl=30)
-            if not acquired:
-                logger.error(f"Could not acquire distributed lock for {lock_key}")
-                raise DistributedLockFailedError(lock_key)
-            
-            inventory = await self.get_inventory(request.product_id, request.store_id)
-            if not inventory:
-                raise InventoryNotFoundError(request.product_id, request.store_id)
-            
-            if inventory.available_quantity < request.quantity:
-                raise InsufficientStockError(inventory.available_quantity, request.quantity)
-            
-            expires_at = datetime.utcnow() + timedelta(minutes=request.ttl_minutes)
-            
-            reservation_db = ReservationDB(
-                order_id=request.order_id,
-                product_id=request.product_id,
-                store_id=request.store_id,
-                quantity=request.quantity,
-                status=ReservationStatus.PENDING,
-                expires_at=expires_at
+            await self.cache_manager.set(
+                cache_key,
+                {**asdict(stock_level), "last_updated": stock_level.last_updated.isoformat()},
+                ttl=STOCK_CACHE_TTL_SECONDS
             )
-            
-            self.db.add(reservation_db)
-            
-            result = await self.db.execute(
+        except Exception as e:
+            logger.warning("Failed to cache stock level", cache_key=cache_key, error=str(e))
+        
+        return stock_level
+    
+    async def _invalidate_stock_level(self, product_id: str, store_id: str) -> None:
+        try:
+            await self.cache_manager.delete(_stock_cache_key(product_id, store_id))
+        except Exception as e:
+            logger.warning(
+                "Failed to invalidate cached stock level",
+                product_id=str(product_id),
+                store_id=str(store_id),
+                error=str(e)
+            )
+    
+    async def reserve_stock(self, db: AsyncSession, request: ReservationRequest) -> ReservationResponse:
+        async with self._key_slot(request.product_id, request.store_id):
+            return await self._reserve_stock(db, request)
+    
+    async def _reserve_stock(self, db: AsyncSession, request: ReservationRequest) -> ReservationResponse:
+        now = datetime.now(timezone.utc)
+        
+        try:
+            # Guarded UPDATE ... RETURNING replaces the pre-read SELECT and version check
+            result = await db.execute(
                 update(InventoryDB)
                 .where(
                     and_(
                         InventoryDB.product_id == request.product_id,
                         InventoryDB.store_id == request.store_id,
-                        InventoryDB.version == inventory.version
+                        InventoryDB.available_quantity >= request.quantity
                     )
                 )
                 .values(
                     available_quantity=InventoryDB.available_quantity - request.quantity,
                     reserved_quantity=InventoryDB.reserved_quantity + request.quantity,
                     version=InventoryDB.version + 1,
-                    last_updated=datetime.utcnow()
+                    last_updated=now
                 )
+                .returning(InventoryDB.id)
             )
             
-            if result.rowcount == 0:
-                raise OptimisticLockConflictError(f"inventory:{request.product_id}:{request.store_id}")
+            if result.first() is None:
+                inventory = await self.get_inventory(db, request.product_id, request.store_id)
+                if not inventory:
+                    raise InventoryNotFoundError(request.product_id, request.store_id)
+                raise InsufficientStockError(inventory.available_quantity, request.quantity)
             
-            await self.event_service.publish_event("reservation_created", {
-                "reservation_id": str(reservation_db.id),
+            expires_at = now + timedelta(minutes=request.ttl_minutes)
+            
+            # Client-side id: nothing below needs a flush or a read back from the instance
+            reservation_id = str(uuid.uuid4())
+            
+            db.add(ReservationDB(
+                id=reservation_id,
+                order_id=request.order_id,
+                product_id=request.product_id,
+                store_id=request.store_id,
+                quantity=request.quantity,
+                status=ReservationStatus.PENDING,
+                expires_at=expires_at
+            ))
+            
+            self.event_service.add_outbox_event(db, "reservation_created", {
+                "reservation_id": reservation_id,
                 "order_id": str(request.order_id),
                 "product_id": str(request.product_id),
                 "store_id": str(request.store_id),
@@ -153,11 +239,12 @@ class InventoryService:
                 "expires_at": expires_at.isoformat()
             })
             
-            await self.db.commit()
+            await db.commit()
+            await self._invalidate_stock_level(request.product_id, request.store_id)
             
             logger.info(
                 "Stock reserved successfully",
-                reservation_id=str(reservation_db.id),
+                reservation_id=reservation_id,
                 order_id=str(request.order_id),
                 product_id=str(request.product_id),
                 store_id=str(request.store_id),
@@ -165,14 +252,14 @@ class InventoryService:
             )
             
             return ReservationResponse(
-                reservation_id=reservation_db.id,
+                reservation_id=reservation_id,
                 status=ReservationStatus.PENDING,
                 expires_at=expires_at,
                 message="Stock reserved successfully"
             )
             
         except Exception as e:
-            await self.db.rollback()
+            await db.rollback()
             logger.error(
                 "Failed to reserve stock",
                 error=str(e),
@@ -181,17 +268,22 @@ class InventoryService:
                 store_id=str(request.store_id)
             )
             raise
-        finally:
-            try:
-                await self.lock_manager.release_lock(lock_key)
-            except Exception as e:
-                logger.error(f"Failed to release distributed lock {lock_key}: {e}")
     
-    async def confirm_reservation(self, reservation_id: str) -> bool:
-        result = await self.db.execute(
-            select(ReservationDB).where(ReservationDB.id == reservation_id)
+    async def confirm_reservation(self, db: AsyncSession, reservation_id: str) -> bool:
+        now = datetime.now(timezone.utc)
+        
+        result = await db.execute(
+            select(
+                ReservationDB.id,
+                ReservationDB.order_id,
+                ReservationDB.product_id,
+                ReservationDB.store_id,
+                ReservationDB.quantity,
+                ReservationDB.status,
+                ReservationDB.expires_at
+            ).where(ReservationDB.id == reservation_id)
         )
-        reservation = result.scalar_one_or_none()
+        reservation = result.one_or_none()
         
         if not reservation:
             raise ReservationNotFoundError(reservation_id)
@@ -203,20 +295,20 @@ class InventoryService:
                 ReservationStatus.PENDING
             )
         
-        if reservation.expires_at < datetime.utcnow():
-            await self._expire_reservation(reservation_id)
+        if as_utc(reservation.expires_at) < now:
+            await self._expire_reservation(db, reservation, now)
             raise ReservationExpiredError(reservation_id)
         
-        await self.db.execute(
+        await db.execute(
             update(ReservationDB)
             .where(ReservationDB.id == reservation_id)
             .values(
                 status=ReservationStatus.CONFIRMED,
-                confirmed_at=datetime.utcnow()
+                confirmed_at=now
             )
         )
         
-        await self.event_service.publish_event("reservation_confirmed", {
+        self.event_service.add_outbox_event(db, "reservation_confirmed", {
                 "reservation_id": str(reservation_id),
                 "order_id": str(reservation.order_id),
                 "product_id": str(reservation.product_id),
@@ -224,7 +316,7 @@ class InventoryService:
                 "quantity": reservation.quantity
             })
         
-        await self.db.commit()
+        await db.commit()
         
         logger.info(
             "Reservation confirmed",
@@ -234,58 +326,55 @@ class InventoryService:
         
         return True
 
-    async def consume_reservation(self, reservation_id: str) -> bool:
-        result = await self.db.execute(
-            select(ReservationDB).where(ReservationDB.id == reservation_id)
-        )
-        reservation = result.scalar_one_or_none()
-        
-        if not reservation:
-            raise Exception("Reservation not found")
-        
-        if reservation.status != ReservationStatus.CONFIRMED:
-            raise Exception("Reservation must be confirmed before consumption")
+    async def consume_reservation(self, db: AsyncSession, reservation_id: str) -> bool:
+        now = datetime.now(timezone.utc)
         
-        inventory_result = await self.db.execute(
-            select(InventoryDB).where(
+        result = await db.execute(
+            update(ReservationDB)
+            .where(
                 and_(
-                    InventoryDB.product_id == reservation.product_id,
-                    InventoryDB.store_id == reservation.store_id
+                    ReservationDB.id == reservation_id,
+                    ReservationDB.status == ReservationStatus.CONFIRMED
                 )
             )
+            .values(status=ReservationStatus.CONSUMED)
+            .returning(
+                ReservationDB.order_id,
+                ReservationDB.product_id,
+                ReservationDB.store_id,
+                ReservationDB.quantity
+            )
         )
-        inventory = inventory_result.scalar_one_or_none()
+        reservation = result.first()
         
-        if not inventory:
-            raise Exception("Inventory not found")
+        if reservation is None:
+            if await self._get_reservation_status(db, reservation_id) is None:
+                raise Exception("Reservation not found")
+            raise Exception("Reservation must be confirmed before consumption")
         
-        result = await self.db.execute(
+        result = await db.execute(
             update(InventoryDB)
             .where(
                 and_(
                     InventoryDB.product_id == reservation.product_id,
                     InventoryDB.store_id == reservation.store_id,
-                    InventoryDB.version == inventory.version
+                    InventoryDB.reserved_quantity >= reservation.quantity
                 )
             )
             .values(
                 reserved_quantity=InventoryDB.reserved_quantity - reservation.quantity,
                 total_quantity=InventoryDB.total_quantity - reservation.quantity,
                 version=InventoryDB.version + 1,
-                last_updated=datetime.utcnow()
+                last_updated=now
             )
+            .returning(InventoryDB.id)
         )
         
-        if result.rowcount == 0:
-            raise Exception("Optimistic lock conflict - inventory was modified by another operation")
+        if result.first() is None:
+            await db.rollback()
+            raise Exception("Inventory not found or reserved quantity is insufficient")
         
-        await self.db.execute(
-            update(ReservationDB)
-            .where(ReservationDB.id == reservation_id)
-            .values(status=ReservationStatus.CONSUMED)
-        )
-        
-        await self.event_service.publish_event("reservation_consumed", {
+        self.event_service.add_outbox_event(db, "reservation_consumed", {
                 "reservation_id": str(reservation_id),
                 "order_id": str(reservation.order_id),
                 "product_id": str(reservation.product_id),
@@ -293,7 +382,8 @@ class InventoryService:
                 "quantity": reservation.quantity
             })
         
-        await self.db.commit()
+        await db.commit()
+        await self._invalidate_stock_level(reservation.product_id, reservation.store_id)
         
         logger.info(
             "Reservation consumed - stock updated",
@@ -304,52 +394,53 @@ class InventoryService:
         
         return True
     
-    async def cancel_reservation(self, reservation_id: str) -> bool:
-        result = await self.db.execute(
-            select(ReservationDB).where(ReservationDB.id == reservation_id)
-        )
-        reservation = result.scalar_one_or_none()
-        
-        if not reservation:
-            raise Exception("Reservation not found")
-        
-        if reservation.status not in [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]:
-            raise Exception("Reservation cannot be cancelled")
-        
-        lock_key = f"inventory_lock:{reservation.product_id}:{reservation.store_id}"
+    async def cancel_reservation(self, db: AsyncSession, reservation_id: str) -> bool:
+        now = datetime.now(timezone.utc)
         
         try:
-            acquired = await self.lock_manager.acquire_lock(lock_key, ttl=30)
-            if not acquired:
-                raise Exception("Could not acquire inventory lock")
-            
-            if reservation.status in [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]:
-                await self.db.execute(
-                    update(InventoryDB)
-                    .where(
-                        and_(
-                            InventoryDB.product_id == reservation.product_id,
-                            InventoryDB.store_id == reservation.store_id
-                        )
-                    )
-                    .values(
-                        available_quantity=InventoryDB.available_quantity + reservation.quantity,
-                        reserved_quantity=InventoryDB.reserved_quantity - reservation.quantity,
-                        version=InventoryDB.version + 1,
-                        last_updated=datetime.utcnow()
+            result = await db.execute(
+                update(ReservationDB)
+                .where(
+                    and_(
+                        ReservationDB.id == reservation_id,
+                        ReservationDB.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED])
                     )
                 )
-            
-            await self.db.execute(
-                update(ReservationDB)
-                .where(ReservationDB.id == reservation_id)
                 .values(
                     status=ReservationStatus.CANCELLED,
-                    cancelled_at=datetime.utcnow()
+                    cancelled_at=now
+                )
+                .returning(
+                    ReservationDB.order_id,
+                    ReservationDB.product_id,
+                    ReservationDB.store_id,
+                    ReservationDB.quantity
+                )
+            )
+            reservation = result.first()
+            
+            if reservation is None:
+                if await self._get_reservation_status(db, reservation_id) is None:
+                    raise Exception("Reservation not found")
+                raise Exception("Reservation cannot be cancelled")
+            
+            await db.execute(
+                update(InventoryDB)
+                .where(
+                    and_(
+                        InventoryDB.product_id == reservation.product_id,
+                        InventoryDB.store_id == reservation.store_id
+                    )
+                )
+                .values(
+                    available_quantity=InventoryDB.available_quantity + reservation.quantity,
+                    reserved_quantity=InventoryDB.reserved_quantity - reservation.quantity,
+                    version=InventoryDB.version + 1,
+                    last_updated=now
                 )
             )
             
-            await self.event_service.publish_event("reservation_cancelled", {
+            self.event_service.add_outbox_event(db, "reservation_cancelled", {
                     "reservation_id": str(reservation_id),
                     "order_id": str(reservation.order_id),
                     "product_id": str(reservation.product_id),
@@ -357,7 +448,8 @@ class InventoryService:
                     "quantity": reservation.quantity
                 })
             
-            await self.db.commit()
+            await db.commit()
+            await self._invalidate_stock_level(reservation.product_id, reservation.store_id)
             
             logger.info(
                 "Reservation cancelled",
@@ -368,28 +460,26 @@ class InventoryService:
             return True
             
         except Exception as e:
-            await self.db.rollback()
+            await db.rollback()
             logger.error(
                 "Failed to cancel reservation",
                 error=str(e),
                 reservation_id=str(reservation_id)
             )
             raise
-        finally:
-            try:
-                await self.lock_manager.release_lock(lock_key)
-            except Exception as e:
-                logger.error(f"Failed to release distributed lock {lock_key}: {e}")
     
-    async def update_stock(self, stock_update: StockUpdate) -> bool:
-        lock_key = f"inventory_lock:{stock_update.product_id}:{stock_update.store_id}"
+    async def update_stock(self, db: AsyncSession, stock_update: StockUpdate) -> bool:
+        async with self._key_slot(stock_update.product_id, stock_update.store_id):
+            return await self._update_stock(db, stock_update)
+    
+    @retry_on_optimistic_conflict(max_attempts=MAX_CAS_ATTEMPTS)
+    async def _update_stock(self, db: AsyncSession, stock_update: StockUpdate) -> bool:
+        now = datetime.now(timezone.utc)
         
         try:
-            acquired = await self.lock_manager.acquire_lock(lock_key, ttl=30)
-            if not acquired:
-                raise Exception("Could not acquire inventory lock")
-            
-            inventory = await self.get_inventory(stock_update.product_id, stock_update.store_id)
+            # Version CAS instead of a distributed lock; conflicts are retried with
+            # backoff by retry_on_optimistic_conflict
+            inventory = await self.get_inventory(db, stock_update.product_id, stock_update.store_id)
             if not inventory:
                 raise Exception("Inventory not found")
             
@@ -397,7 +487,7 @@ class InventoryService:
             if new_available < 0:
                 raise Exception("Stock cannot go below zero")
             
-            result = await self.db.execute(
+            result = await db.execute(
                 update(InventoryDB)
                 .where(
                     and_(
@@ -410,14 +500,14 @@ class InventoryService:
                     available_quantity=new_available,
                     total_quantity=InventoryDB.total_quantity + stock_update.quantity_change,
                     version=InventoryDB.version + 1,
-                    last_updated=datetime.utcnow()
+                    last_updated=now
                 )
             )
             
             if result.rowcount == 0:
                 raise OptimisticLockConflictError(f"inventory:{stock_update.product_id}:{stock_update.store_id}")
             
-            await self.event_service.publish_event("stock_updated", {
+            self.event_service.add_outbox_event(db, "stock_updated", {
                 "product_id": str(stock_update.product_id),
                 "store_id": str(stock_update.store_id),
                 "quantity_change": stock_update.quantity_change,
@@ -426,7 +516,8 @@ class InventoryService:
                 "reference_id": stock_update.reference_id
             })
             
-            await self.db.commit()
+            await db.commit()
+            await self._invalidate_stock_level(stock_update.product_id, stock_update.store_id)
             
             logger.info(
                 "Stock updated successfully",
@@ -438,8 +529,12 @@ class InventoryService:
             
             return True
             
+        except OptimisticLockConflictError:
+            # Retried by retry_on_optimistic_conflict, which logs if retries run out
+            await db.rollback()
+            raise
         except Exception as e:
-            await self.db.rollback()
+            await db.rollback()
             logger.error(
                 "Failed to update stock",
                 error=str(e),
@@ -447,22 +542,24 @@ class InventoryService:
                 store_id=str(stock_update.store_id)
             )
             raise
-        finally:
-            try:
-                await self.lock_manager.release_lock(lock_key)
-            except Exception as e:
-                logger.error(f"Failed to release distributed lock {lock_key}: {e}")
     
-    async def _expire_reservation(self, reservation_id: str):
-        result = await self.db.execute(
-            select(ReservationDB).where(ReservationDB.id == reservation_id)
+    async def _expire_reservation(self, db: AsyncSession, reservation: Row, now: datetime):
+        # Reuses the row the caller already loaded; the status guard replaces a re-read
+        result = await db.execute(
+            update(ReservationDB)
+            .where(
+                and_(
+                    ReservationDB.id == reservation.id,
+                    ReservationDB.status == ReservationStatus.PENDING
+                )
+            )
+            .values(status=ReservationStatus.EXPIRED)
         )
-        reservation = result.scalar_one_or_none()
         
-        if not reservation or reservation.status != ReservationStatus.PENDING:
+        if result.rowcount == 0:
             return
         
-        await self.db.execute(
+        await db.execute(
             update(InventoryDB)
             .where(
                 and_(
@@ -473,59 +570,209 @@ class InventoryService:
             .values(
                 available_quantity=InventoryDB.available_quantity + reservation.quantity,
                 reserved_quantity=InventoryDB.reserved_quantity - reservation.quantity,
-                last_updated=datetime.utcnow()
+                version=InventoryDB.version + 1,
+                last_updated=now
             )
         )
         
-        await self.db.execute(
-            update(ReservationDB)
-            .where(ReservationDB.id == reservation_id)
-            .values(status=ReservationStatus.EXPIRED)
-        )
-        
-        await self._publish_event("reservation_expired", {
-            "reservation_id": str(reservation_id),
+        self.event_service.add_outbox_event(db, "reservation_expired", {
+            "reservation_id": str(reservation.id),
             "order_id": str(reservation.order_id),
             "product_id": str(reservation.product_id),
             "store_id": str(reservation.store_id),
             "quantity": reservation.quantity
         })
+        
+        await db.commit()
+        await self._invalidate_stock_level(reservation.product_id, reservation.store_id)
+    
+    async def expire_reservations_batch(
+        self,
+        db: AsyncSession,
+        now: Optional[datetime] = None,
+        limit: int = EXPIRY_BATCH_SIZE
+    ) -> int:
+        now = now or datetime.now(timezone.utc)
+        expired_ids = await self.get_expired_reservation_ids(db, now, limit)
+        if not expired_ids:
+            return 0
+        
+        try:
+            # The status guard makes concurrent passes disjoint: stock is only released
+            # by the pass whose UPDATE actually flipped the reservation
+            result = await db.execute(
+                update(ReservationDB)
+                .where(
+                    and_(
+                        ReservationDB.id.in_(expired_ids),
+                        ReservationDB.status == ReservationStatus.PENDING
+                    )
+                )
+                .values(status=ReservationStatus.EXPIRED)
+                .returning(
+                    ReservationDB.id,
+                    ReservationDB.order_id,
+                    ReservationDB.product_id,
+                    ReservationDB.store_id,
+                    ReservationDB.quantity
+                )
+                .execution_options(synchronize_session=False)
+            )
+            expired = result.all()
+            if not expired:
+                await db.rollback()
+                return 0
+            
+            released: Dict[Tuple[str, str], int] = defaultdict(int)
+            for reservation in expired:
+                released[(reservation.product_id, reservation.store_id)] += reservation.quantity
+            
+            # One executemany for all (product, store) groups
+            inventory = InventoryDB.__table__
+            await db.execute(
+                update(inventory)
+                .where(
+                    and_(
+                        inventory.c.product_id == bindparam("p_product_id"),
+                        inventory.c.store_id == bindparam("p_store_id")
+                    )
+                )
+                .values(
+                    available_quantity=inventory.c.available_quantity + bindparam("p_quantity"),
+                    reserved_quantity=inventory.c.reserved_quantity - bindparam("p_quantity"),
+                    version=inventory.c.version + 1,
+                    last_updated=now
+                ),
+                [
+                    {"p_product_id": product_id, "p_store_id": store_id, "p_quantity": quantity}
+                    for (product_id, store_id), quantity in released.items()
+                ]
+            )
+            
+            for reservation in expired:
+                self.event_service.add_outbox_event(db, "reservation_expired", {
+                    "reservation_id": str(reservation.id),
+                    "order_id": str(reservation.order_id),
+                    "product_id": str(reservation.product_id),
+                    "store_id": str(reservation.store_id),
+                    "quantity": reservation.quantity
+                })
+            
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to expire reservations batch", error=str(e), batch_size=len(expired_ids))
+            raise
+        
+        # Only the stock keys this batch touched, in a single DEL
+        try:
+            await self.cache_manager.mdelete([_stock_cache_key(*key) for key in released])
+        except Exception as e:
+            logger.warning("Failed to invalidate cached stock levels", keys=len(released), error=str(e))
+        
+        logger.info("Expired reservations batch", batch_size=len(expired), inventory_rows=len(released))
+        
+        return len(expired)
     
+    async def run_reservation_expiry(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float = EXPIRY_POLL_INTERVAL_SECONDS
+    ) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    expired = await self.expire_reservations_batch(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Reservation expiry failed", error=str(e))
+                expired = 0
+            
+            # A full batch means more are waiting; only idle once caught up
+            if expired < EXPIRY_BATCH_SIZE:
+                await asyncio.sleep(interval)
+    
+    async def _get_reservation_status(self, db: AsyncSession, reservation_id: str) -> Optional[str]:
+        result = await db.execute(
+            lambda_stmt(lambda: select(ReservationDB.status).where(ReservationDB.id == reservation_id))
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_expired_reservation_ids(
+        self, db: AsyncSession, now: Optional[datetime] = None, limit: Optional[int] = None
+    ) -> List[str]:
+        # Filter in SQL against idx_reservation_pending_expiry instead of loading
+        # reservations and checking is_expired one by one
+        result = await db.execute(
+            select(ReservationDB.id)
+            .where(
+                and_(
+                    ReservationDB.status == ReservationStatus.PENDING,
+                    ReservationDB.expires_at < (now or datetime.now(timezone.utc))
+                )
+            )
+            .order_by(ReservationDB.expires_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
 
-    async def get_all_products(self) -> List[Product]:
-        result = await self.db.execute(select(ProductDB))
-        products_db = result.scalars().all()
-        
-        products = []
-        for product_db in products_db:
-            products.append(Product(
-                id=product_db.id,
-                sku=product_db.sku,
-                name=product_db.name,
-                description=product_db.description,
-                category=product_db.category,
-                unit_price=product_db.unit_price / 100,
-                created_at=product_db.created_at,
-                updated_at=product_db.updated_at
-            ))
+    async def get_all_products(self, db: AsyncSession) -> List[Product]:
+        cached = self._all_products_cache
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        # Core column select + model_construct: rows come straight from our own tables,
+        # so skip ORM instance building and Pydantic re-validation
+        result = await db.execute(
+            select(
+                ProductDB.id,
+                ProductDB.sku,
+                ProductDB.name,
+                ProductDB.description,
+                ProductDB.category,
+                ProductDB.unit_price_units.label("unit_price"),
+                ProductDB.created_at,
+                ProductDB.updated_at
+            )
+        )
+        
+        products = [
+            Product.model_construct(
+                id=row.id,
+                sku=row.sku,
+                name=row.name,
+                description=row.description,
+                category=row.category,
+                unit_price=row.unit_price,
+                created_at=row.created_at,
+                updated_at=row.updated_at
+            )
+            for row in result
+        ]
         
+        expires = time.monotonic() + PRODUCT_CACHE_TTL_SECONDS
+        self._all_products_cache = (expires, products)
+        self._product_cache.update((product.id, (expires, product)) for product in products)
         return products
 
-    async def get_all_inventory(self) -> List[Inventory]:
-        result = await self.db.execute(select(InventoryDB))
-        inventory_db = result.scalars().all()
-        
-        inventory = []
-        for inv_db in inventory_db:
-            inventory.append(Inventory(
-                id=inv_db.id,
-                product_id=inv_db.product_id,
-                store_id=inv_db.store_id,
-                available_quantity=inv_db.available_quantity,
-                reserved_quantity=inv_db.reserved_quantity,
-                total_quantity=inv_db.total_quantity,
-                version=inv_db.version,
-                last_updated=inv_db.last_updated
-            ))
-        
-        return inventory
+    async def get_all_inventory(self, db: AsyncSession) -> List[Inventory]:
+        result = await db.execute(select(*_INVENTORY_COLUMNS))
+        return [_inventory_from_row(row) for row in result]
+    
+    async def get_inventory_page(
+        self, db: AsyncSession, limit: int, after_id: Optional[str] = None
+    ) -> List[Inventory]:
+        # Keyset pagination on the primary key; cost stays flat however deep the page
+        stmt = select(*_INVENTORY_COLUMNS).order_by(InventoryDB.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(InventoryDB.id > after_id)
+        result = await db.execute(stmt)
+        return [_inventory_from_row(row) for row in result]
+    
+    async def stream_all_inventory(self, db: AsyncSession) -> AsyncIterator[Inventory]:
+        result = await db.stream(
+            select(*_INVENTORY_COLUMNS).execution_options(yield_per=INVENTORY_STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield _inventory_from_row(row)
@@ -1,10 +1,10 @@
 from datetime import datetime
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists
 
 from src.models.database import StoreDB, InventoryDB
-from src.models.store import Store, StoreInventory
+from src.models.store import Store, StoreInventory, StoreStatus
 from src.interfaces.event_bus import EventBus
 from src.utils.logging import get_logger
 from src.exceptions import StoreNotFoundError
@@ -13,31 +13,43 @@ logger = get_logger(__name__)
 
 
 class StoreService:
-    def __init__(self, db: AsyncSession, event_bus: EventBus):
-        self.db = db
+    def __init__(self, event_bus: EventBus):
         self.event_bus = event_bus
     
-    async def get_all_stores(self) -> List[Store]:
-        result = await self.db.execute(select(StoreDB))
-        stores_db = result.scalars().all()
+    async def get_all_stores(self, db: AsyncSession) -> List[Store]:
+        # Core column select + model_construct: trusted rows skip ORM and Pydantic validation
+        result = await db.execute(
+            select(
+                StoreDB.id,
+                StoreDB.name,
+                StoreDB.address,
+                StoreDB.city,
+                StoreDB.country,
+                StoreDB.zip_code,
+                StoreDB.status,
+                StoreDB.timezone,
+                StoreDB.created_at,
+                StoreDB.updated_at
+            )
+        )
         return [
-            Store(
-                id=store_db.id,
-                name=store_db.name,
-                address=store_db.address,
-                city=store_db.city,
-                country=store_db.country,
-                zip_code=store_db.zip_code,
-                status=store_db.status,
-                timezone=store_db.timezone,
-                created_at=store_db.created_at,
-                updated_at=store_db.updated_at
+            Store.model_construct(
+                id=row.id,
+                name=row.name,
+                address=row.address,
+                city=row.city,
+                country=row.country,
+                zip_code=row.zip_code,
+                status=StoreStatus(row.status),
+                timezone=row.timezone,
+                created_at=row.created_at,
+                updated_at=row.updated_at
             )
-            for store_db in stores_db
+            for row in result
         ]
     
-    async def get_store(self, store_id: str) -> Optional[Store]:
-        result = await self.db.execute(
+    async def get_store(self, db: AsyncSession, store_id: str) -> Optional[Store]:
+        result = await db.execute(
             select(StoreDB).where(StoreDB.id == store_id)
         )
         store_db = result.scalar_one_or_none()
@@ -56,15 +68,25 @@ class StoreService:
             updated_at=store_db.updated_at
         )
     
-    async def get_store_inventory(self, store_id: str) -> List[StoreInventory]:
-        store = await self.get_store(store_id)
-        if not store:
-            raise StoreNotFoundError(store_id)
-        
-        result = await self.db.execute(
-            select(InventoryDB).where(InventoryDB.store_id == store_id)
+    async def get_store_inventory(self, db: AsyncSession, store_id: str) -> List[StoreInventory]:
+        result = await db.execute(
+            select(
+                InventoryDB.store_id,
+                InventoryDB.product_id,
+                InventoryDB.available_quantity,
+                InventoryDB.reserved_quantity,
+                InventoryDB.total_quantity,
+                InventoryDB.last_updated,
+                InventoryDB.version
+            ).where(InventoryDB.store_id == store_id)
         )
-        inventory_db = result.scalars().all()
+        inventory_db = result.all()
+        
+        # Inventory rows imply the store exists (FK); only check on an empty result
+        if not inventory_db:
+            store_exists = await db.scalar(select(exists().where(StoreDB.id == store_id)))
+            if not store_exists:
+                raise StoreNotFoundError(store_id)
         
         return [
             StoreInventory(
@@ -7,10 +7,17 @@ import pytest
 import asyncio
 import logging
 from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from src.services.inventory_service import InventoryService
-from src.models.inventory import Inventory, ReservationStatus
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.utils.database import Base
+from src.models.database import InventoryDB, OutboxEventDB, ReservationDB
+from src.services.event_service import EventService
+from src.services.inventory_service import InventoryService, MAX_CAS_ATTEMPTS
+from src.utils.error_utils import retry_on_optimistic_conflict
+from src.models.inventory import Inventory, ReservationRequest, ReservationStatus, StockUpdate
 from src.schemas.inventory_schemas import ReservationRequestSchema, StockUpdateSchema
 from src.exceptions import (
     InsufficientStockError,
@@ -19,11 +26,39 @@ from src.exceptions import (
     DistributedLockFailedError
 )
 
+PROD_ID = "123e4567-e89b-12d3-a456-426614174000"
+STORE_ID = "123e4567-e89b-12d3-a456-426614174001"
+NOW = datetime(2024, 1, 1)
+
+
+# Shared, never mutated; tests that change quantities take a model_copy()
+INVENTORY = Inventory(
+    id="inv-1",
+    product_id=PROD_ID,
+    store_id=STORE_ID,
+    available_quantity=5,
+    reserved_quantity=0,
+    version=1,
+    last_updated=NOW
+)
+INVENTORY_V2 = INVENTORY.model_copy(update={"version": 2})
+LOW_STOCK_INVENTORY = INVENTORY.model_copy(update={"available_quantity": 2})
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Base SQLite real en un archivo temporal, con el esquema completo."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'inventory.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
 
 class TestInventorySystem:
     """Tests del sistema de inventario distribuido."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_service(self):
         """Mock del InventoryService."""
         service = MagicMock(spec=InventoryService)
@@ -36,19 +71,16 @@ class TestInventorySystem:
         service.cancel_reservation = AsyncMock()
         return service
 
+    @pytest.fixture(autouse=True)
+    def _reset_mock_service(self, mock_service):
+        """Limpia valores y side effects configurados por el test anterior."""
+        yield
+        mock_service.reset_mock(return_value=True, side_effect=True)
+
     @pytest.mark.asyncio
     async def test_concurrent_reservations_prevent_overselling(self, mock_service):
         """Valida que reservas concurrentes previenen overselling."""
-        mock_inventory = Inventory(
-            id="inv-1",
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
-            total_quantity=5,
-            available_quantity=5,
-            reserved_quantity=0,
-            version=1,
-            last_updated=datetime.utcnow()
-        )
+        mock_inventory = INVENTORY.model_copy()
         
         mock_service.get_inventory.return_value = mock_inventory
         mock_service.lock_manager.acquire_lock.return_value = True
@@ -65,42 +97,33 @@ class TestInventorySystem:
         mock_service.reserve_stock.side_effect = side_effect_reserve
         
         async def reserve_stock():
-            try:
-                return await mock_service.reserve_stock(
-                    product_id="123e4567-e89b-12d3-a456-426614174000",
-                    store_id="123e4567-e89b-12d3-a456-426614174001",
-                    request=ReservationRequestSchema(
-                        order_id="ORDER-123",
-                        product_id="123e4567-e89b-12d3-a456-426614174000",
-                        store_id="123e4567-e89b-12d3-a456-426614174001",
-                        quantity=3,
-                        ttl_minutes=30
-                    )
+            return await mock_service.reserve_stock(
+                product_id=PROD_ID,
+                store_id=STORE_ID,
+                request=ReservationRequestSchema.model_construct(
+                    order_id="ORDER-123",
+                    product_id=PROD_ID,
+                    store_id=STORE_ID,
+                    quantity=3,
+                    ttl_minutes=30
                 )
-            except InsufficientStockError:
-                return None
+            )
         
+        # gather keeps the losing reservation's error as a result instead of
+        # cancelling the other task the way a TaskGroup would
         results = await asyncio.gather(reserve_stock(), reserve_stock(), return_exceptions=True)
         
-        successful_reservations = [r for r in results if r is not None and not isinstance(r, Exception)]
+        successful_reservations = [r for r in results if not isinstance(r, Exception)]
         failed_reservations = [r for r in results if isinstance(r, InsufficientStockError)]
         
         assert len(successful_reservations) == 1
-        assert len(failed_reservations) >= 0
+        assert len(failed_reservations) == 1
+        assert mock_inventory.available_quantity == 2
 
     @pytest.mark.asyncio
     async def test_optimistic_locking_prevents_version_conflicts(self, mock_service):
         """Valida que optimistic locking previene conflictos de versión."""
-        mock_inventory = Inventory(
-            id="inv-1",
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
-            total_quantity=5,
-            available_quantity=5,
-            reserved_quantity=0,
-            version=2,
-            last_updated=datetime.utcnow()
-        )
+        mock_inventory = INVENTORY_V2
         
         mock_service.get_inventory.return_value = mock_inventory
         mock_service.update_stock.side_effect = OptimisticLockConflictError(
@@ -109,11 +132,11 @@ class TestInventorySystem:
         
         with pytest.raises(OptimisticLockConflictError) as exc_info:
             await mock_service.update_stock(
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
-                request=StockUpdateSchema(
-                    product_id="123e4567-e89b-12d3-a456-426614174000",
-                    store_id="123e4567-e89b-12d3-a456-426614174001",
+                product_id=PROD_ID,
+                store_id=STORE_ID,
+                request=StockUpdateSchema.model_construct(
+                    product_id=PROD_ID,
+                    store_id=STORE_ID,
                     quantity=10,
                     operation="add"
                 )
@@ -124,16 +147,7 @@ class TestInventorySystem:
     @pytest.mark.asyncio
     async def test_reserve_stock_decreases_available_quantity(self, mock_service):
         """Valida que reservar stock reduce la cantidad disponible."""
-        mock_inventory = Inventory(
-            id="inv-1",
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
-            total_quantity=5,
-            available_quantity=5,
-            reserved_quantity=0,
-            version=1,
-            last_updated=datetime.utcnow()
-        )
+        mock_inventory = INVENTORY
         
         mock_service.get_inventory.return_value = mock_inventory
         mock_service.lock_manager.acquire_lock.return_value = True
@@ -147,12 +161,12 @@ class TestInventorySystem:
         mock_service.reserve_stock.return_value = mock_reservation
         
         result = await mock_service.reserve_stock(
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
-            request=ReservationRequestSchema(
+            product_id=PROD_ID,
+            store_id=STORE_ID,
+            request=ReservationRequestSchema.model_construct(
                 order_id="ORDER-123",
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
+                product_id=PROD_ID,
+                store_id=STORE_ID,
                 quantity=2,
                 ttl_minutes=30
             )
@@ -206,16 +220,7 @@ class TestInventorySystem:
     @pytest.mark.asyncio
     async def test_insufficient_stock_raises_error(self, mock_service):
         """Valida que stock insuficiente genera error apropiado."""
-        mock_inventory = Inventory(
-            id="inv-1",
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
-            total_quantity=2,
-            available_quantity=2,
-            reserved_quantity=0,
-            version=1,
-            last_updated=datetime.utcnow()
-        )
+        mock_inventory = LOW_STOCK_INVENTORY
         
         mock_service.get_inventory.return_value = mock_inventory
         mock_service.lock_manager.acquire_lock.return_value = True
@@ -227,12 +232,12 @@ class TestInventorySystem:
         
         with pytest.raises(InsufficientStockError) as exc_info:
             await mock_service.reserve_stock(
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
-                request=ReservationRequestSchema(
+                product_id=PROD_ID,
+                store_id=STORE_ID,
+                request=ReservationRequestSchema.model_construct(
                     order_id="ORDER-123",
-                    product_id="123e4567-e89b-12d3-a456-426614174000",
-                    store_id="123e4567-e89b-12d3-a456-426614174001",
+                    product_id=PROD_ID,
+                    store_id=STORE_ID,
                     quantity=5,
                     ttl_minutes=30
                 )
@@ -245,17 +250,17 @@ class TestInventorySystem:
         """Valida que producto inexistente genera error apropiado."""
         mock_service.reserve_stock.side_effect = InventoryNotFoundError(
             product_id="123e4567-e89b-12d3-a456-426614174999", 
-            store_id="123e4567-e89b-12d3-a456-426614174001"
+            store_id=STORE_ID
         )
         
         with pytest.raises(InventoryNotFoundError) as exc_info:
             await mock_service.reserve_stock(
                 product_id="123e4567-e89b-12d3-a456-426614174999",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
-                request=ReservationRequestSchema(
+                store_id=STORE_ID,
+                request=ReservationRequestSchema.model_construct(
                     order_id="ORDER-123",
                     product_id="123e4567-e89b-12d3-a456-426614174999",
-                    store_id="123e4567-e89b-12d3-a456-426614174001",
+                    store_id=STORE_ID,
                     quantity=1,
                     ttl_minutes=30
                 )
@@ -271,8 +276,8 @@ class TestInventorySystem:
         result = await mock_service.event_service.publish_event(
             event_type="stock_reserved",
             data={
-                "product_id": "123e4567-e89b-12d3-a456-426614174000",
-                "store_id": "123e4567-e89b-12d3-a456-426614174001",
+                "product_id": PROD_ID,
+                "store_id": STORE_ID,
                 "quantity": 2,
                 "reservation_id": "res-1"
             }
@@ -282,13 +287,37 @@ class TestInventorySystem:
         mock_service.event_service.publish_event.assert_called_once_with(
             event_type="stock_reserved",
             data={
-                "product_id": "123e4567-e89b-12d3-a456-426614174000",
-                "store_id": "123e4567-e89b-12d3-a456-426614174001",
+                "product_id": PROD_ID,
+                "store_id": STORE_ID,
                 "quantity": 2,
                 "reservation_id": "res-1"
             }
         )
 
+    @pytest.mark.asyncio
+    async def test_expire_reservation_publishes_event_and_commits(self):
+        """Valida que expirar una reserva registra el evento en el outbox y confirma la transacción."""
+        service = InventoryService(MagicMock(), AsyncMock(), AsyncMock())
+        service.event_service = MagicMock()
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(rowcount=1)
+        reservation = MagicMock(
+            id="res-1",
+            order_id="ORDER-1",
+            product_id=PROD_ID,
+            store_id=STORE_ID,
+            quantity=2
+        )
+        
+        await service._expire_reservation(db, reservation, NOW)
+        
+        service.event_service.add_outbox_event.assert_called_once()
+        assert service.event_service.add_outbox_event.call_args.args[1] == "reservation_expired"
+        db.commit.assert_awaited_once()
+        service.cache_manager.delete.assert_awaited_once_with(
+            "stock:123e4567-e89b-12d3-a456-426614174000:123e4567-e89b-12d3-a456-426614174001"
+        )
+
     @pytest.mark.asyncio
     async def test_stock_update_publishes_event(self, mock_service):
         """Valida que actualizar stock publica evento correspondiente."""
@@ -297,8 +326,8 @@ class TestInventorySystem:
         result = await mock_service.event_service.publish_event(
             event_type="stock_updated",
             data={
-                "product_id": "123e4567-e89b-12d3-a456-426614174000",
-                "store_id": "123e4567-e89b-12d3-a456-426614174001",
+                "product_id": PROD_ID,
+                "store_id": STORE_ID,
                 "old_quantity": 10,
                 "new_quantity": 15,
                 "version": 2
@@ -309,8 +338,8 @@ class TestInventorySystem:
         mock_service.event_service.publish_event.assert_called_once_with(
             event_type="stock_updated",
             data={
-                "product_id": "123e4567-e89b-12d3-a456-426614174000",
-                "store_id": "123e4567-e89b-12d3-a456-426614174001",
+                "product_id": PROD_ID,
+                "store_id": STORE_ID,
                 "old_quantity": 10,
                 "new_quantity": 15,
                 "version": 2
@@ -326,8 +355,8 @@ class TestInventorySystem:
         
         with pytest.raises(DistributedLockFailedError) as exc_info:
             await mock_service.reserve_stock(
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
+                product_id=PROD_ID,
+                store_id=STORE_ID,
                 request=MagicMock(quantity=1, ttl_minutes=30)
             )
         
@@ -340,8 +369,8 @@ class TestInventorySystem:
         
         with pytest.raises(Exception) as exc_info:
             await mock_service.update_stock(
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
+                product_id=PROD_ID,
+                store_id=STORE_ID,
                 request=MagicMock(quantity=10, operation="add")
             )
         
@@ -360,8 +389,8 @@ class TestInventorySystem:
         )
         
         result = await mock_service.reserve_stock(
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
+            product_id=PROD_ID,
+            store_id=STORE_ID,
             request=MagicMock(quantity=1, ttl_minutes=30)
         )
         
@@ -380,8 +409,8 @@ class TestInventorySystem:
         )
         
         result = await mock_service.reserve_stock(
-            product_id="123e4567-e89b-12d3-a456-426614174000",
-            store_id="123e4567-e89b-12d3-a456-426614174001",
+            product_id=PROD_ID,
+            store_id=STORE_ID,
             request=MagicMock(quantity=1, ttl_minutes=30)
         )
         
@@ -401,8 +430,8 @@ class TestInventorySystem:
         with patch('logging.getLogger') as mock_logger:
             mock_logger.return_value.info = MagicMock()
             result = await mock_service.reserve_stock(
-                product_id="123e4567-e89b-12d3-a456-426614174000",
-                store_id="123e4567-e89b-12d3-a456-426614174001",
+                product_id=PROD_ID,
+                store_id=STORE_ID,
                 request=MagicMock(quantity=1, ttl_minutes=30)
             )
             
@@ -418,7 +447,281 @@ class TestInventorySystem:
             mock_logger.return_value.error = MagicMock()
             with pytest.raises(Exception):
                 await mock_service.reserve_stock(
-                    product_id="123e4567-e89b-12d3-a456-426614174000",
-                    store_id="123e4567-e89b-12d3-a456-426614174001",
+                    product_id=PROD_ID,
+                    store_id=STORE_ID,
                     request=MagicMock(quantity=1, ttl_minutes=30)
-                )
\ No newline at end of file
+                )
+
+
+class TestOutboxRelay:
+    """Tests del relay del outbox contra una base de datos real."""
+
+    async def _add_events(self, session_factory, count):
+        async with session_factory() as db:
+            event_service = EventService(AsyncMock())
+            for i in range(count):
+                event_service.add_outbox_event(db, "stock_updated", {"n": i}, topic=f"topic-{i}")
+            await db.commit()
+
+    async def _outbox_rows(self, session_factory):
+        async with session_factory() as db:
+            result = await db.execute(select(OutboxEventDB).order_by(OutboxEventDB.id))
+            return result.scalars().all()
+
+    @pytest.mark.asyncio
+    async def test_relay_publishes_in_order_and_marks_published(self, session_factory):
+        """Valida que el relay publica en orden de inserción y marca los eventos como publicados."""
+        await self._add_events(session_factory, 3)
+        event_bus = AsyncMock()
+        relay = EventService(event_bus)
+        
+        async with session_factory() as db:
+            assert await relay.relay_outbox(db) == 3
+        
+        event_bus.publish_many.assert_awaited_once()
+        published = event_bus.publish_many.await_args.args[0]
+        assert [topic for topic, _ in published] == ["topic-0", "topic-1", "topic-2"]
+        assert all(row.published_at is not None for row in await self._outbox_rows(session_factory))
+        
+        async with session_factory() as db:
+            assert await relay.relay_outbox(db) == 0
+        event_bus.publish_many.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_relay_publish_failure_leaves_rows_unpublished(self, session_factory):
+        """Valida que un fallo al publicar deja los eventos pendientes y sin reclamar."""
+        await self._add_events(session_factory, 2)
+        event_bus = AsyncMock()
+        event_bus.publish_many.side_effect = ConnectionError("Redis down")
+        
+        async with session_factory() as db:
+            with pytest.raises(ConnectionError):
+                await EventService(event_bus).relay_outbox(db)
+        
+        rows = await self._outbox_rows(session_factory)
+        assert all(row.published_at is None and row.claimed_by is None for row in rows)
+        
+        event_bus.publish_many.side_effect = None
+        async with session_factory() as db:
+            assert await EventService(event_bus).relay_outbox(db) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_relays_do_not_publish_same_rows(self, session_factory):
+        """Valida que un segundo relay no reclama eventos ya reclamados por otro."""
+        await self._add_events(session_factory, 2)
+        other_relay = EventService(AsyncMock())
+        claimed_by_other = []
+        
+        async def publish_many(messages):
+            async with session_factory() as other_db:
+                claimed_by_other.append(await other_relay.relay_outbox(other_db))
+        
+        event_bus = AsyncMock()
+        event_bus.publish_many.side_effect = publish_many
+        
+        async with session_factory() as db:
+            assert await EventService(event_bus).relay_outbox(db) == 2
+        
+        assert claimed_by_other == [0]
+        other_relay.event_bus.publish_many.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_prune_outbox_deletes_only_old_published_rows(self, session_factory):
+        """Valida que la poda borra solo eventos publicados fuera de la retención."""
+        await self._add_events(session_factory, 3)
+        relay = EventService(AsyncMock())
+        async with session_factory() as db:
+            await relay.relay_outbox(db, limit=2)
+        
+        async with session_factory() as db:
+            assert await relay.prune_outbox(db, retention_seconds=3600) == 0
+            assert await relay.prune_outbox(db, retention_seconds=-1) == 2
+        
+        rows = await self._outbox_rows(session_factory)
+        assert len(rows) == 1 and rows[0].published_at is None
+
+
+class TestReservationExpiry:
+    """Tests de la expiración por lotes contra una base de datos real."""
+
+    @pytest.mark.asyncio
+    async def test_expire_batch_flips_only_expired_pending_and_restores_stock(self, session_factory):
+        """Valida que solo las reservas PENDING vencidas expiran y liberan su stock."""
+        now = datetime.now(timezone.utc)
+        async with session_factory() as db:
+            db.add(InventoryDB(
+                id="inv-1", product_id=PROD_ID, store_id=STORE_ID,
+                available_quantity=5, reserved_quantity=5, total_quantity=10, version=1
+            ))
+            db.add_all([
+                ReservationDB(
+                    id="res-expired", order_id="ORDER-1", product_id=PROD_ID, store_id=STORE_ID,
+                    quantity=2, status=ReservationStatus.PENDING, expires_at=now - timedelta(minutes=1)
+                ),
+                ReservationDB(
+                    id="res-active", order_id="ORDER-2", product_id=PROD_ID, store_id=STORE_ID,
+                    quantity=1, status=ReservationStatus.PENDING, expires_at=now + timedelta(minutes=10)
+                ),
+                ReservationDB(
+                    id="res-confirmed", order_id="ORDER-3", product_id=PROD_ID, store_id=STORE_ID,
+                    quantity=2, status=ReservationStatus.CONFIRMED, expires_at=now - timedelta(minutes=1)
+                ),
+            ])
+            await db.commit()
+        
+        service = InventoryService(AsyncMock(), AsyncMock(), AsyncMock())
+        async with session_factory() as db:
+            assert await service.expire_reservations_batch(db, now=now) == 1
+        async with session_factory() as db:
+            assert await service.expire_reservations_batch(db, now=now) == 0
+        
+        async with session_factory() as db:
+            statuses = dict((await db.execute(select(ReservationDB.id, ReservationDB.status))).all())
+            inventory = (await db.execute(select(InventoryDB))).scalar_one()
+            events = (await db.execute(select(OutboxEventDB.event_type))).scalars().all()
+        
+        assert statuses == {
+            "res-expired": ReservationStatus.EXPIRED,
+            "res-active": ReservationStatus.PENDING,
+            "res-confirmed": ReservationStatus.CONFIRMED
+        }
+        assert (inventory.available_quantity, inventory.reserved_quantity, inventory.version) == (7, 3, 2)
+        assert events == ["reservation_expired"]
+        service.cache_manager.mdelete.assert_awaited_once_with([f"stock:{PROD_ID}:{STORE_ID}"])
+
+
+class TestOptimisticRetry:
+    """Tests del reintento con backoff ante conflictos de versión."""
+
+    @pytest.mark.asyncio
+    async def test_retries_conflict_until_success(self):
+        """Valida que un conflicto de versión se reintenta hasta tener éxito."""
+        operation = AsyncMock(side_effect=[
+            OptimisticLockConflictError("inventory:1"),
+            OptimisticLockConflictError("inventory:1"),
+            "ok"
+        ])
+        
+        assert await retry_on_optimistic_conflict(max_attempts=3, base=0)(operation)() == "ok"
+        assert operation.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Valida que tras max_attempts conflictos se propaga el error."""
+        operation = AsyncMock(side_effect=OptimisticLockConflictError("inventory:1"))
+        
+        with pytest.raises(OptimisticLockConflictError):
+            await retry_on_optimistic_conflict(max_attempts=4, base=0)(operation)()
+        assert operation.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_errors_pass_through(self):
+        """Valida que errores no reintentables se propagan sin reintentar."""
+        for error in (InsufficientStockError(available=1, requested=2), RuntimeError("boom")):
+            operation = AsyncMock(side_effect=error)
+            with pytest.raises(type(error)):
+                await retry_on_optimistic_conflict(max_attempts=5, base=0)(operation)()
+            assert operation.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_stock_rolls_back_and_rereads_between_attempts(self):
+        """Valida que cada intento fallido hace rollback y relee el inventario."""
+        service = InventoryService(AsyncMock(), AsyncMock(), AsyncMock())
+        service.get_inventory = AsyncMock(return_value=INVENTORY)
+        db = AsyncMock()
+        db.add = MagicMock()
+        db.execute.side_effect = [MagicMock(rowcount=0), MagicMock(rowcount=0), MagicMock(rowcount=1)]
+        
+        with patch("src.services.inventory_service.logger") as service_logger, \
+                patch("src.utils.error_utils.logger") as retry_logger:
+            assert await service.update_stock(db, StockUpdate(PROD_ID, STORE_ID, 3, "restock")) is True
+        
+        service_logger.error.assert_not_called()
+        retry_logger.error.assert_not_called()
+        assert retry_logger.debug.call_count == 2
+        assert service.get_inventory.await_count == 3
+        assert db.rollback.await_count == 2
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_stock_gives_up_after_max_cas_attempts(self):
+        """Valida que update_stock propaga el conflicto tras MAX_CAS_ATTEMPTS intentos."""
+        service = InventoryService(AsyncMock(), AsyncMock(), AsyncMock())
+        service.get_inventory = AsyncMock(return_value=INVENTORY)
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(rowcount=0)
+        
+        with patch("src.utils.error_utils.logger") as retry_logger:
+            with pytest.raises(OptimisticLockConflictError):
+                await service.update_stock(db, StockUpdate(PROD_ID, STORE_ID, 3, "restock"))
+        
+        retry_logger.error.assert_called_once()
+        assert db.rollback.await_count == MAX_CAS_ATTEMPTS
+        db.commit.assert_not_awaited()
+
+
+class TestReserveStockPersistence:
+    """Tests de reserve_stock (UPDATE condicionado) contra una base de datos real."""
+
+    @pytest.fixture
+    async def service(self, session_factory):
+        async with session_factory() as db:
+            db.add(InventoryDB(
+                id="inv-1", product_id=PROD_ID, store_id=STORE_ID,
+                available_quantity=5, reserved_quantity=0, total_quantity=5, version=1
+            ))
+            await db.commit()
+        return InventoryService(AsyncMock(), AsyncMock(), AsyncMock())
+
+    async def _state(self, session_factory):
+        async with session_factory() as db:
+            inventory = (await db.execute(select(InventoryDB))).scalar_one()
+            reservations = (await db.execute(select(ReservationDB))).scalars().all()
+            events = (await db.execute(select(OutboxEventDB.event_type))).scalars().all()
+        return (inventory.available_quantity, inventory.reserved_quantity, inventory.version), reservations, events
+
+    def _request(self, quantity, store_id=STORE_ID):
+        return ReservationRequest(
+            order_id="ORDER-1", product_id=PROD_ID, store_id=store_id, quantity=quantity, ttl_minutes=15
+        )
+
+    @pytest.mark.asyncio
+    async def test_reserve_writes_reservation_and_outbox_in_one_commit(self, service, session_factory):
+        """Valida que la reserva, el stock y el evento del outbox se confirman en la misma transacción."""
+        pending_at_commit = []
+        async with session_factory() as db:
+            commit = db.commit
+            
+            async def spy_commit():
+                pending_at_commit.append(sorted(type(obj).__name__ for obj in db.new))
+                await commit()
+            
+            db.commit = spy_commit
+            response = await service.reserve_stock(db, self._request(3))
+        
+        assert pending_at_commit == [["OutboxEventDB", "ReservationDB"]]
+        stock, reservations, events = await self._state(session_factory)
+        assert stock == (2, 3, 2)
+        assert [r.id for r in reservations] == [response.reservation_id]
+        assert reservations[0].status == ReservationStatus.PENDING
+        assert events == ["reservation_created"]
+
+    @pytest.mark.asyncio
+    async def test_reserve_insufficient_stock_leaves_inventory_untouched(self, service, session_factory):
+        """Valida que el guard de stock rechaza la reserva sin modificar nada."""
+        async with session_factory() as db:
+            with pytest.raises(InsufficientStockError):
+                await service.reserve_stock(db, self._request(6))
+        
+        assert await self._state(session_factory) == ((5, 0, 1), [], [])
+
+    @pytest.mark.asyncio
+    async def test_reserve_missing_inventory_raises_not_found(self, service, session_factory):
+        """Valida que reservar en una tienda sin inventario devuelve not found."""
+        async with session_factory() as db:
+            with pytest.raises(InventoryNotFoundError):
+                await service.reserve_stock(
+                    db, self._request(1, store_id="123e4567-e89b-12d3-a456-426614174999")
+                )
+        
+        assert await self._state(session_factory) == ((5, 0, 1), [], [])
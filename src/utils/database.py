@@ -1,17 +1,33 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import MetaData
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.exc import OperationalError, DisconnectionError
-from config.settings import settings
+from config.settings import get_settings
 import structlog
 
 logger = structlog.get_logger()
+settings = get_settings()
+
+_database_url = settings.database_url.replace("sqlite://", "sqlite+aiosqlite://")
+
+if _database_url.startswith("sqlite"):
+    # SQLAlchemy's default SQLite pool keeps aiosqlite connections (and their threads) alive
+    _pool_options = {}
+else:
+    _pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        # Reuse the most recently returned connection so idle ones can age out
+        "pool_use_lifo": True,
+    }
 
 engine = create_async_engine(
-    settings.database_url.replace("sqlite://", "sqlite+aiosqlite://"),
+    _database_url,
     echo=settings.debug,
-    future=True
+    future=True,
+    **_pool_options
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -25,15 +41,15 @@ metadata = MetaData()
 
 
 async def get_db():
+    # FastAPI caches dependencies per request, so every Depends(get_db) in one request
+    # already shares this session and its identity map; no scoped registry needed
     async with AsyncSessionLocal() as session:
         try:
             yield session
         except (OperationalError, DisconnectionError) as e:
-            logger.error(f"Database session error: {e}")
+            logger.error("Database session error", error=str(e))
             await session.rollback()
             raise
-        finally:
-            await session.close()
 
 
 async def init_db():
@@ -1,3 +1,6 @@
+import asyncio
+import random
+from functools import wraps
 from fastapi import HTTPException, status
 from src.exceptions import InventoryServiceBaseException
 from src.utils.logging import get_logger
@@ -7,14 +10,47 @@ logger = get_logger(__name__)
 
 
 def handle_service_exception(ex: Exception) -> HTTPException:
-    if isinstance(ex, InventoryServiceBaseException):
-        return HTTPException(
-            status_code=ex.status_code,
-            detail=ex.error_msg
-        )
-    else:
-        logger.error(f"Unhandled exception type: {type(ex)}")
-        return HTTPException(
-            status_code=RESP_INTERNAL_SERVER_ERROR,
-            detail=str(ex) or SERVER_ERROR
-        )
+    # Each service exception class carries its own status_code, so one class pattern covers them all
+    match ex:
+        case InventoryServiceBaseException(status_code=status_code, error_msg=error_msg):
+            return HTTPException(status_code=status_code, detail=error_msg)
+        case _:
+            logger.error("Unhandled exception type", exc_type=type(ex).__name__)
+            return HTTPException(
+                status_code=RESP_INTERNAL_SERVER_ERROR,
+                detail=str(ex) or SERVER_ERROR
+            )
+
+
+def retry_on_optimistic_conflict(max_attempts: int = 5, base: float = 0.005, cap: float = 0.1):
+    # Only exceptions flagged retryable (version conflicts) are retried; the rest propagate
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts - 1):
+                try:
+                    return await fn(*args, **kwargs)
+                except InventoryServiceBaseException as e:
+                    if not e.retryable:
+                        raise
+                    logger.debug(
+                        "Retrying after retryable conflict",
+                        operation=fn.__qualname__,
+                        attempt=attempt + 1,
+                        error=e.error_msg
+                    )
+                    # Capped exponential backoff with jitter so conflicting writers spread out
+                    await asyncio.sleep(min(cap, base * 2 ** attempt) * (0.5 + random.random()))
+            try:
+                return await fn(*args, **kwargs)
+            except InventoryServiceBaseException as e:
+                if e.retryable:
+                    logger.error(
+                        "Retries exhausted",
+                        operation=fn.__qualname__,
+                        attempts=max_attempts,
+                        error=e.error_msg
+                    )
+                raise
+        return wrapper
+    return decorator
@@ -1,14 +1,23 @@
 import structlog
 import logging
+import orjson
 import sys
-from config.settings import settings
+from config.settings import get_settings
+
+settings = get_settings()
+
+
+def _orjson_dumps(event_dict, **kwargs) -> str:
+    return orjson.dumps(event_dict, default=kwargs.get("default")).decode()
 
 
 def configure_logging():
+    level = getattr(logging, settings.log_level.upper())
+    
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, settings.log_level.upper()),
+        level=level,
     )
     
     structlog.configure(
@@ -21,12 +30,13 @@ def configure_logging():
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if settings.log_format == "json" 
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps) if settings.log_format == "json" 
             else structlog.dev.ConsoleRenderer(),
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # Calls below the configured level become no-ops before any processor runs
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         cache_logger_on_first_use=True,
     )
 
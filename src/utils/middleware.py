@@ -1,61 +1,107 @@
+import os
 import time
-import uuid
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.utils.logging import get_logger
+from config.settings import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
 
+# "Request started" is debug-only; skip building its fields entirely otherwise
+LOG_REQUEST_START = settings.log_level.upper() == "DEBUG"
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        correlation_id = str(uuid.uuid4())
-        request.state.correlation_id = correlation_id
+# Probes and Prometheus scrapes: neither logged nor recorded as request metrics
+_SKIP_PATHS = frozenset({"/health", "/health/", "/health/ready", "/health/metrics"})
+
+
+class LoggingMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware: no per-request task group or body streaming queue
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        start_time = time.time()
+        # 24 hex chars from the OS CSPRNG; no UUID object or hyphenated formatting
+        correlation_id = os.urandom(12).hex()
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
         
-        logger.info(
-            "Request started",
-            method=request.method,
-            url=str(request.url),
-            correlation_id=correlation_id,
-            client_ip=request.client.host if request.client else None
-        )
+        method = scope["method"]
+        url = str(URL(scope=scope))
+        
+        start_ns = time.perf_counter_ns()
         
-        response = await call_next(request)
+        if LOG_REQUEST_START:
+            client = scope.get("client")
+            logger.debug(
+                "Request started",
+                method=method,
+                url=url,
+                correlation_id=correlation_id,
+                client_ip=client[0] if client else None
+            )
         
-        process_time = time.time() - start_time
+        status_code = None
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Append the raw header pair; no MutableHeaders lookup or re-encoding
+                message["headers"] = [
+                    *message.get("headers", ()), (b"x-correlation-id", correlation_id.encode("ascii"))
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+        
+        # Monotonic integer clock; whole milliseconds render without float formatting
+        duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             "Request completed",
-            method=request.method,
-            url=str(request.url),
-            status_code=response.status_code,
-            process_time=process_time,
+            method=method,
+            url=url,
+            status_code=status_code,
+            duration_ms=duration_ms,
             correlation_id=correlation_id
         )
-        
-        response.headers["X-Correlation-ID"] = correlation_id
-        return response
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, prometheus_client):
-        super().__init__(app)
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, prometheus_client):
+        self.app = app
         self.prometheus_client = prometheus_client
     
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        process_time = time.time() - start_time
+        start_ns = time.perf_counter_ns()
+        status_code = 500
         
-        self.prometheus_client.record_request_metrics(
-            method=request.method,
-            endpoint=request.url.path,
-            status_code=response.status_code,
-            duration=process_time
-        )
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Histograms are in seconds; convert once from the integer clock
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
+            
+            # Label by route template so path parameters don't create a series per id
+            route = scope.get("route")
+            
+            self.prometheus_client.record_request_metrics(
+                method=scope["method"],
+                endpoint=route.path if route is not None else "unmatched",
+                status_code=status_code,
+                duration=duration
+            )
@@ -1,7 +1,13 @@
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import gzip
 import time
 
+MAX_CACHED_LABEL_SETS = 10_000
+MAX_STOCK_LEVEL_SERIES = 1000
+METRICS_CACHE_TTL_SECONDS = 1.0
+
 
 class PrometheusMetrics:
     def __init__(self):
@@ -47,33 +53,72 @@ class PrometheusMetrics:
             ['store_id', 'status'],
             registry=self.registry
         )
+        
+        self._request_count_children: Dict[Tuple, Any] = {}
+        self._request_duration_children: Dict[Tuple, Any] = {}
+        self._stock_level_children: OrderedDict = OrderedDict()
+        self._reservation_children: Dict[Tuple, Any] = {}
+        self._sync_children: Dict[Tuple, Any] = {}
+        
+        self._exposition: Optional[bytes] = None
+        self._exposition_gzip: Optional[bytes] = None
+        self._exposition_at = 0.0
+    
+    def _child(self, metric, cache: Dict[Tuple, Any], key: Tuple):
+        # .labels() hashes, locks and looks up on every call; resolve each label set once
+        child = cache.get(key)
+        if child is None:
+            child = metric.labels(*key)
+            if len(cache) < MAX_CACHED_LABEL_SETS:
+                cache[key] = child
+        return child
     
     def record_request_metrics(self, method: str, endpoint: str, status_code: int, duration: float):
-        self.request_count.labels(
-            method=method,
-            endpoint=endpoint,
-            status_code=str(status_code)
+        self._child(
+            self.request_count, self._request_count_children, (method, endpoint, str(status_code))
         ).inc()
         
-        self.request_duration.labels(
-            method=method,
-            endpoint=endpoint
+        self._child(
+            self.request_duration, self._request_duration_children, (method, endpoint)
         ).observe(duration)
     
     def update_stock_level(self, product_id: str, store_id: str, quantity: int):
-        self.inventory_stock_level.labels(
-            product_id=product_id,
-            store_id=store_id
-        ).set(quantity)
+        # LRU over (product_id, store_id): evicted series are removed from the gauge so
+        # the registry and every scrape stay bounded regardless of catalog size
+        key = (product_id, store_id)
+        children = self._stock_level_children
+        child = children.get(key)
+        if child is None:
+            child = self.inventory_stock_level.labels(product_id, store_id)
+            children[key] = child
+            if len(children) > MAX_STOCK_LEVEL_SERIES:
+                evicted, _ = children.popitem(last=False)
+                self.inventory_stock_level.remove(*evicted)
+        else:
+            children.move_to_end(key)
+        child.set(quantity)
     
     def record_reservation(self, status: str):
-        self.reservation_count.labels(status=status).inc()
+        self._child(self.reservation_count, self._reservation_children, (status,)).inc()
     
     def record_sync_operation(self, store_id: str, status: str):
-        self.sync_operations.labels(store_id=store_id, status=status).inc()
+        self._child(self.sync_operations, self._sync_children, (store_id, status)).inc()
+    
+    def get_metrics(self) -> bytes:
+        # Scrapes within the TTL share one exposition. generate_latest is synchronous,
+        # so concurrent requests on the loop can't rebuild it at the same time.
+        now = time.monotonic()
+        if self._exposition is None or now - self._exposition_at >= METRICS_CACHE_TTL_SECONDS:
+            self._exposition = generate_latest(self.registry)
+            self._exposition_gzip = None
+            self._exposition_at = now
+        return self._exposition
     
-    def get_metrics(self) -> str:
-        return generate_latest(self.registry).decode('utf-8')
+    def get_metrics_gzip(self) -> bytes:
+        data = self.get_metrics()
+        if self._exposition_gzip is None:
+            self._exposition_gzip = gzip.compress(data, compresslevel=5)
+        return self._exposition_gzip
 
 
 prometheus_metrics = PrometheusMetrics()
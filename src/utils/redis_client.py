@@ -1,24 +1,55 @@
 import redis.asyncio as redis
-import json
-from typing import Optional, Any, Dict
-from config.settings import settings
+import orjson
+import secrets
+from redis.commands.core import AsyncScript
+from contextlib import asynccontextmanager
+from typing import Optional, Any, AsyncIterator, Dict, List, Tuple
+from config.settings import get_settings
+from src.exceptions import DistributedLockFailedError
 import structlog
 
 logger = structlog.get_logger()
+settings = get_settings()
+
+
+# Compare-and-delete: only the holder of the token may release the lock
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+else
+    return 0
+end
+"""
+
+
+def _encode(value: Any) -> Any:
+    # Redis takes bytes, str and numbers as-is; everything else goes through orjson
+    if isinstance(value, (bytes, str, int, float)):
+        return value
+    return orjson.dumps(value)
 
 
 class RedisClient:
     def __init__(self):
+        self.pool: Optional[redis.BlockingConnectionPool] = None
         self.redis: Optional[redis.Redis] = None
+        self._unlock: Optional[AsyncScript] = None
     
     async def connect(self):
         try:
-            self.redis = redis.from_url(
+            # Raw bytes in and out: orjson produces and parses bytes without a str round trip.
+            # Bounded pool: callers wait for a free connection instead of opening new ones.
+            self.pool = redis.BlockingConnectionPool.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
+                max_connections=settings.redis_max_connections,
+                health_check_interval=settings.redis_health_check_interval,
+                socket_timeout=settings.redis_socket_timeout,
+                socket_keepalive=True,
+                decode_responses=False
             )
+            self.redis = redis.Redis(connection_pool=self.pool)
             await self.redis.ping()
+            self._unlock = self.redis.register_script(_UNLOCK_SCRIPT)
             logger.info("Connected to Redis")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
@@ -27,12 +58,12 @@ class RedisClient:
     async def disconnect(self):
         if self.redis:
             await self.redis.close()
+            await self.pool.disconnect()
             logger.info("Disconnected from Redis")
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+            value = _encode(value)
             
             if ttl:
                 await self.redis.setex(key, ttl, value)
@@ -42,7 +73,7 @@ class RedisClient:
             logger.error(f"Redis set operation failed for key {key}: {e}")
             raise
     
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[bytes]:
         try:
             return await self.redis.get(key)
         except Exception as e:
@@ -53,11 +84,39 @@ class RedisClient:
         value = await self.get(key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
                 return None
         return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        try:
+            return await self.redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Redis mget operation failed for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+    
+    async def mset(self, mapping: Dict[str, Any]):
+        if not mapping:
+            return
+        try:
+            await self.redis.mset({key: _encode(value) for key, value in mapping.items()})
+        except Exception as e:
+            logger.error(f"Redis mset operation failed for {len(mapping)} keys: {e}")
+            raise
+    
+    @asynccontextmanager
+    async def pipe(self) -> AsyncIterator[redis.client.Pipeline]:
+        # Queue commands on the yielded pipeline; they go out in one round trip on exit
+        pipeline = self.redis.pipeline(transaction=False)
+        try:
+            yield pipeline
+            await pipeline.execute()
+        finally:
+            await pipeline.reset()
+    
     async def delete(self, key: str):
         try:
             await self.redis.delete(key)
@@ -70,28 +129,64 @@ class RedisClient:
     
     async def publish(self, channel: str, message: Dict):
         try:
-            await self.redis.publish(channel, json.dumps(message))
+            await self.redis.publish(channel, orjson.dumps(message))
         except Exception as e:
             logger.error(f"Redis publish failed for channel {channel}: {e}")
             raise
     
+    async def publish_many(self, messages: List[Tuple[str, Dict]]):
+        # The same dict sent to several channels is only serialized once
+        encoded: Dict[int, bytes] = {}
+        try:
+            async with self.pipe() as pipeline:
+                for channel, message in messages:
+                    payload = encoded.get(id(message))
+                    if payload is None:
+                        payload = encoded[id(message)] = orjson.dumps(message)
+                    pipeline.publish(channel, payload)
+        except Exception as e:
+            logger.error(f"Redis publish failed for batch of {len(messages)} messages: {e}")
+            raise
+    
+    async def fan_out(self, channels: List[str], message: Dict):
+        payload = orjson.dumps(message)
+        try:
+            async with self.pipe() as pipeline:
+                for channel in channels:
+                    pipeline.publish(channel, payload)
+        except Exception as e:
+            logger.error(f"Redis fan-out failed for channels {channels}: {e}")
+            raise
+    
     async def subscribe(self, channel: str):
         pubsub = self.redis.pubsub()
         await pubsub.subscribe(channel)
         return pubsub
     
-    async def acquire_lock(self, key: str, ttl: int = 30) -> bool:
+    async def acquire_lock(self, key: str, ttl: int = 30) -> Optional[str]:
+        token = secrets.token_hex(16)
         try:
-            return await self.redis.set(key, "locked", nx=True, ex=ttl)
+            if await self.redis.set(key, token, nx=True, ex=ttl):
+                return token
         except Exception as e:
             logger.error(f"Redis lock acquisition failed for key {key}: {e}")
-            return False
+        return None
     
-    async def release_lock(self, key: str):
+    async def release_lock(self, key: str, token: str):
         try:
-            await self.redis.delete(key)
+            await self._unlock(keys=[key], args=[token])
         except Exception as e:
             logger.error(f"Redis lock release failed for key {key}: {e}")
+    
+    @asynccontextmanager
+    async def locked(self, key: str, ttl: int = 30) -> AsyncIterator[str]:
+        token = await self.acquire_lock(key, ttl)
+        if token is None:
+            raise DistributedLockFailedError(key)
+        try:
+            yield token
+        finally:
+            await self.release_lock(key, token)
 
 
 redis_client = RedisClient()